@@ -1,19 +1,40 @@
-from fastapi import FastAPI, HTTPException, Depends
+import time
+
+# Référence des mesures de démarrage (import de l'application)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import TypeAdapter
+from sqlalchemy import func, inspect, text
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional
+import asyncio
+import json
 import logging
+import os
+import threading
 
-from database import get_db, engine
+from database import get_db, engine, init_schema
+import metrics
 import models
 import schemas
-from services.data_loader import DataLoader
+from services.symbols import CRYPTO_SYMBOLS, FRENCH_STOCKS
+from services.data_version import versions
+from services.response_cache import (
+    CachedResponse, json_response, make_etag, not_modified, not_modified_response, response_cache
+)
+from services.workers import shutdown_process_pool
 
-# Création des tables
-models.Base.metadata.create_all(bind=engine)
+# Les modules lourds (pandas, numpy, fournisseurs, features, inférence, risque, screener)
+# sont importés au premier usage ou par le préchauffage lancé après le démarrage.
 
 app = FastAPI(title="Trading IA Backend", version="1.0.0")
+# Les routes déclarées ci-dessous sont profilables à chaud (voir /debug/profiling)
+app.router.route_class = metrics.ProfiledRoute
 
 # Configuration CORS
 app.add_middleware(
@@ -22,13 +43,185 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-data_loader = DataLoader()
+ASSET_CLASSES = ("crypto", "stocks")
+
+# État de démarrage exposé par /ready
+startup_state = {"schema": False, "warmed_up": False, "error": None, "ready_at": None}
+_warmup_task: Optional[asyncio.Task] = None
+_stop_warmup = threading.Event()
+# Délais entre deux tentatives de préchauffage (doublés jusqu'au maximum)
+WARMUP_RETRY_DELAY = 1.0
+WARMUP_RETRY_MAX_DELAY = 60.0
+_first_requests = set()
+
+
+def update_features(asset_class: str, symbol: str):
+    """Matérialise les features des barres qui viennent d'être chargées"""
+    from services.features import feature_store
+    feature_store.update(engine, asset_class, symbol)
+
+
+def run_inference(asset_class: str, symbol: str):
+    """Recalcule les signaux du symbole à partir de ses features à jour"""
+    get_inference_service().run(engine, keys=[(asset_class, symbol)])
+
+
+def refresh_snapshot(asset_class: str, symbol: str):
+    """Met à jour la ligne du symbole dans la table du screener"""
+    from services.screener import update_snapshot
+    update_snapshot(engine, asset_class, symbol)
+
+
+@lru_cache(maxsize=None)
+def get_data_loader():
+    """DataLoader créé au premier usage (fournisseurs et validation chargés à ce moment)"""
+    from services.data_loader import DataLoader
+    loader = DataLoader()
+    # L'ordre compte : l'inférence lit les features matérialisées juste avant
+    loader.add_commit_listener(update_features)
+    loader.add_commit_listener(run_inference)
+    loader.add_commit_listener(refresh_snapshot)
+    return loader
+
+
+@lru_cache(maxsize=None)
+def get_inference_service():
+    """Service d'inférence ; les modèles sont chargés une seule fois et restent en mémoire"""
+    from services.features import feature_store
+    from services.inference import InferenceService, model_registry
+    model_registry.load()
+    return InferenceService(feature_store, model_registry)
+
+
+def warm_up():
+    """Importe les modules lourds et charge les modèles hors du chemin des requêtes
+
+    Réessaie avec un délai croissant tant qu'il échoue : /ready reste à 503 entre-temps et
+    expose la dernière erreur. Les étapes déjà réussies sont gardées en cache.
+    """
+    started = time.perf_counter()
+    delay = WARMUP_RETRY_DELAY
+    while not _stop_warmup.is_set():
+        try:
+            get_data_loader()
+            get_inference_service()
+            import services.risk  # noqa: F401
+            import services.screener  # noqa: F401
+            break
+        except Exception as e:
+            startup_state["error"] = f"warmup: {e}"
+            logger.error(f"Echec du prechauffage, nouvel essai dans {delay:.0f}s: {e}")
+            _stop_warmup.wait(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_DELAY)
+    else:
+        return
+    startup_state["warmed_up"] = True
+    startup_state["error"] = None
+    metrics.STARTUP_PHASE_DURATION.labels(phase="warmup").set(time.perf_counter() - started)
+    logger.info(f"Prechauffage termine en {time.perf_counter() - started:.2f}s")
+
+
+@app.on_event("startup")
+async def start_up():
+    """Schéma (optionnel) puis préchauffage en arrière-plan : le processus répond dès maintenant"""
+    global _warmup_task
+    metrics.STARTUP_PHASE_DURATION.labels(phase="import").set(_app_imported - _import_started)
+    if os.getenv("SCHEMA_AUTO_CREATE", "1") == "1":
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(init_schema)
+        except Exception as e:
+            # La base peut arriver après le backend : /ready le signalera
+            logger.error(f"Creation du schema impossible: {e}")
+        metrics.STARTUP_PHASE_DURATION.labels(phase="schema").set(time.perf_counter() - started)
+    if os.getenv("WARMUP_ON_STARTUP", "1") == "1":
+        _warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    else:
+        startup_state["warmed_up"] = True
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    _stop_warmup.set()
+    shutdown_process_pool()
+
+
+@app.on_event("shutdown")
+async def close_providers():
+    # Seulement si le DataLoader a été créé (pas d'import des fournisseurs à l'arrêt)
+    if get_data_loader.cache_info().currsize:
+        await get_data_loader().close()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latence par route (modèle de chemin, pas l'URL brute)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = metrics.route_label(request.scope) or "unmatched"
+        metrics.HTTP_REQUEST_DURATION.labels(
+            method=request.method,
+            route=route,
+            status=str(status),
+        ).observe(elapsed)
+        if route not in _first_requests:
+            _first_requests.add(route)
+            metrics.FIRST_REQUEST_DURATION.labels(route=route).set(elapsed)
+
+
+_BAR_ADAPTERS = {
+    "crypto": (models.CryptoData, TypeAdapter(List[schemas.CryptoData])),
+    "stocks": (models.StockData, TypeAdapter(List[schemas.StockData])),
+}
+
+
+def _versioned_bars(
+    request: Request,
+    db: Session,
+    asset_class: str,
+    symbol: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: int,
+) -> Response:
+    """Sert les barres d'un symbole avec ETag, 304 et cache partagé par version de données
+
+    Tant que la version du symbole ne change pas, une requête identique est servie depuis
+    le cache sans requête SQL ni sérialisation.
+    """
+    model, adapter = _BAR_ADAPTERS[asset_class]
+    version, updated_at = versions.get(db, asset_class, symbol)
+    etag = make_etag(asset_class, symbol, version, start_date, end_date, limit)
+    if not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+
+    key = (asset_class, symbol, start_date, end_date, limit)
+    entry = response_cache.get(key, version)
+    if entry is None:
+        query = db.query(model).filter(model.symbol == symbol)
+        if start_date:
+            query = query.filter(model.timestamp >= start_date)
+        if end_date:
+            query = query.filter(model.timestamp <= end_date)
+        data = query.order_by(model.timestamp.desc()).limit(limit).all()
+
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        entry = CachedResponse(version, etag, updated_at, body)
+        response_cache.put(key, entry)
+    return json_response(entry)
 
 
 @app.get("/")
@@ -38,14 +231,72 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """Vivacité du processus (ne vérifie pas les dépendances)"""
     return {"status": "healthy"}
 
 
+def _schema_ready() -> bool:
+    if not startup_state["schema"]:
+        startup_state["schema"] = inspect(engine).has_table(models.SymbolVersion.__tablename__)
+    return startup_state["schema"]
+
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """Prêt à recevoir du trafic : base joignable, schéma présent et préchauffage terminé"""
+    checks = {"database": False, "schema": False, "warmed_up": startup_state["warmed_up"]}
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = True
+        checks["schema"] = _schema_ready()
+    except Exception as e:
+        logger.warning(f"Base indisponible pour /ready: {e}")
+
+    ready = all(checks.values())
+    if ready and startup_state["ready_at"] is None:
+        startup_state["ready_at"] = time.perf_counter()
+        metrics.TIME_TO_READY.set(startup_state["ready_at"] - _import_started)
+    response.status_code = 200 if ready else 503
+    return {
+        "status": "ready" if ready else "starting",
+        "checks": checks,
+        "error": startup_state["error"],
+        "startup_seconds": round((startup_state["ready_at"] or time.perf_counter()) - _import_started, 3),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Métriques au format Prometheus"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/debug/profiling")
+def get_profiling():
+    """État du profilage par requête et derniers profils enregistrés"""
+    return metrics.profiling.snapshot()
+
+
+@app.put("/debug/profiling")
+def set_profiling(enabled: bool, sample_rate: Optional[float] = None, top: Optional[int] = None):
+    """Active ou désactive le profilage par requête sans redémarrage"""
+    if sample_rate is not None:
+        if not 0.0 < sample_rate <= 1.0:
+            raise HTTPException(status_code=400, detail="sample_rate doit etre dans ]0, 1]")
+        metrics.profiling.sample_rate = sample_rate
+    if top is not None:
+        metrics.profiling.top = top
+    metrics.profiling.enabled = enabled
+    logger.info(f"Profilage {'active' if enabled else 'desactive'} (sample_rate={metrics.profiling.sample_rate})")
+    return metrics.profiling.snapshot()
+
+
 # Routes pour les données historiques crypto
 @app.get("/api/crypto/symbols", response_model=List[str])
 def get_crypto_symbols():
     """Retourne la liste des symboles crypto disponibles"""
-    return data_loader.get_available_crypto_symbols()
+    return CRYPTO_SYMBOLS
 
 
 @app.post("/api/crypto/load")
@@ -60,7 +311,7 @@ async def load_crypto_data(
         if not end_date:
             end_date = datetime.now().strftime("%Y-%m-%d")
         
-        data = await data_loader.load_crypto_data(symbol, start_date, end_date, db)
+        data = await get_data_loader().load_crypto_data(symbol, start_date, end_date, db)
         return {
             "status": "success",
             "symbol": symbol,
@@ -75,6 +326,7 @@ async def load_crypto_data(
 
 @app.get("/api/crypto/data/{symbol}", response_model=List[schemas.CryptoData])
 def get_crypto_data(
+    request: Request,
     symbol: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -82,22 +334,14 @@ def get_crypto_data(
     db: Session = Depends(get_db)
 ):
     """Récupère les données historiques d'une crypto depuis la DB"""
-    query = db.query(models.CryptoData).filter(models.CryptoData.symbol == symbol)
-    
-    if start_date:
-        query = query.filter(models.CryptoData.timestamp >= start_date)
-    if end_date:
-        query = query.filter(models.CryptoData.timestamp <= end_date)
-    
-    data = query.order_by(models.CryptoData.timestamp.desc()).limit(limit).all()
-    return data
+    return _versioned_bars(request, db, "crypto", symbol, start_date, end_date, limit)
 
 
 # Routes pour les données de bourse française
 @app.get("/api/stocks/symbols", response_model=List[str])
 def get_french_stock_symbols():
     """Retourne la liste des symboles boursiers français disponibles"""
-    return data_loader.get_available_french_stocks()
+    return FRENCH_STOCKS
 
 
 @app.post("/api/stocks/load")
@@ -112,7 +356,7 @@ async def load_stock_data(
         if not end_date:
             end_date = datetime.now().strftime("%Y-%m-%d")
         
-        data = await data_loader.load_stock_data(symbol, start_date, end_date, db)
+        data = await get_data_loader().load_stock_data(symbol, start_date, end_date, db)
         return {
             "status": "success",
             "symbol": symbol,
@@ -127,6 +371,7 @@ async def load_stock_data(
 
 @app.get("/api/stocks/data/{symbol}", response_model=List[schemas.StockData])
 def get_stock_data(
+    request: Request,
     symbol: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -134,33 +379,214 @@ def get_stock_data(
     db: Session = Depends(get_db)
 ):
     """Récupère les données historiques d'une action depuis la DB"""
-    query = db.query(models.StockData).filter(models.StockData.symbol == symbol)
-    
-    if start_date:
-        query = query.filter(models.StockData.timestamp >= start_date)
-    if end_date:
-        query = query.filter(models.StockData.timestamp <= end_date)
-    
-    data = query.order_by(models.StockData.timestamp.desc()).limit(limit).all()
-    return data
+    return _versioned_bars(request, db, "stocks", symbol, start_date, end_date, limit)
+
+
+# Routes pour le feature store
+@app.get("/api/features")
+def get_features():
+    """Colonnes des features et symboles matérialisés"""
+    from services.features import FEATURE_COLUMNS, feature_store
+    return {"columns": FEATURE_COLUMNS, "materialized": feature_store.list_materialized()}
+
+
+@app.post("/api/features/build")
+def build_features(
+    asset_class: Optional[str] = None,
+    symbols: Optional[List[str]] = Query(None),
+    full: bool = False,
+):
+    """Matérialise les features d'un ensemble de symboles (tout l'univers par défaut)"""
+    if asset_class and asset_class not in ASSET_CLASSES:
+        raise HTTPException(status_code=400, detail=f"asset_class doit etre parmi {ASSET_CLASSES}")
+    if symbols and not asset_class:
+        raise HTTPException(status_code=400, detail="asset_class est requis avec symbols")
+    from services.features import feature_store
+    return feature_store.build(
+        engine,
+        asset_classes=[asset_class] if asset_class else ASSET_CLASSES,
+        symbols=symbols,
+        full=full,
+    )
+
+
+# Routes pour les signaux des modèles
+@app.get("/api/signals", response_model=List[schemas.Signal])
+def get_signals(
+    model: Optional[str] = None,
+    asset_class: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Derniers signaux (une ligne par modèle et par symbole)"""
+    query = db.query(models.Signal)
+    if model:
+        query = query.filter(models.Signal.model == model)
+    if asset_class:
+        query = query.filter(models.Signal.asset_class == asset_class)
+    return query.order_by(models.Signal.model, models.Signal.asset_class, models.Signal.symbol).all()
+
+
+@app.post("/api/signals/refresh")
+def refresh_signals(reload_models: bool = False):
+    """Recalcule les signaux de tous les symboles matérialisés"""
+    from services.features import feature_store
+    inference_service = get_inference_service()
+    if reload_models:
+        inference_service.registry.load()
+    keys = [(m["asset_class"], m["symbol"]) for m in feature_store.list_materialized()]
+    return inference_service.run(engine, keys=keys)
+
+
+# Routes pour le screener
+@app.get("/api/screener")
+def run_screener(
+    query: str,
+    asset_class: Optional[str] = None,
+    sort: Optional[str] = None,
+    descending: bool = False,
+    limit: int = Query(100, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Filtre les symboles sur leur dernier snapshot (ex: `RSI(14) < 30 and close > SMA(200)`)"""
+    if asset_class and asset_class not in ASSET_CLASSES:
+        raise HTTPException(status_code=400, detail=f"asset_class doit etre parmi {ASSET_CLASSES}")
+    from services.screener import ScreenerError, screen
+    try:
+        return screen(db, query, asset_class=asset_class, sort=sort, descending=descending, limit=limit)
+    except ScreenerError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/screener/rebuild")
+def rebuild_screener(asset_class: Optional[str] = None):
+    """Recalcule les snapshots de tous les symboles stockés"""
+    if asset_class and asset_class not in ASSET_CLASSES:
+        raise HTTPException(status_code=400, detail=f"asset_class doit etre parmi {ASSET_CLASSES}")
+    from services.screener import rebuild_snapshots
+    return rebuild_snapshots(engine, [asset_class] if asset_class else ASSET_CLASSES)
+
+
+# Route pour le risque de portefeuille
+@app.post("/api/risk")
+def compute_risk(request: schemas.RiskRequest, db: Session = Depends(get_db)):
+    """VaR / CVaR historiques et Monte Carlo, distribution des drawdowns d'un portefeuille"""
+    if any(not 0.5 <= c < 1.0 for c in request.confidence_levels):
+        raise HTTPException(status_code=400, detail="confidence_levels doivent etre dans [0.5, 1[")
+    from services.risk import portfolio_risk
+    try:
+        return portfolio_risk(
+            db,
+            [(p.asset_class, p.symbol, p.weight) for p in request.positions],
+            lookback_days=request.lookback_days,
+            horizon_days=request.horizon_days,
+            n_paths=request.n_paths,
+            confidence_levels=request.confidence_levels,
+            seed=request.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Routes pour la qualité des données
+def _quality_report(report: models.DataQualityReport) -> dict:
+    return {
+        "asset_class": report.asset_class,
+        "symbol": report.symbol,
+        "provider": report.provider,
+        "rows_in": report.rows_in,
+        "rows_out": report.rows_out,
+        "quarantined": report.quarantined,
+        "repaired": report.repaired,
+        "flagged": report.flagged,
+        "checks": report.checks,
+        "created_at": report.created_at,
+    }
+
+
+@app.get("/api/quality")
+def get_quality_reports(asset_class: Optional[str] = None, db: Session = Depends(get_db)):
+    """Dernier rapport de qualité de chaque symbole"""
+    latest = db.query(func.max(models.DataQualityReport.id)).group_by(
+        models.DataQualityReport.asset_class, models.DataQualityReport.symbol
+    )
+    query = db.query(models.DataQualityReport).filter(models.DataQualityReport.id.in_(latest))
+    if asset_class:
+        query = query.filter(models.DataQualityReport.asset_class == asset_class)
+    reports = query.order_by(models.DataQualityReport.asset_class, models.DataQualityReport.symbol).all()
+    return [_quality_report(r) for r in reports]
+
+
+@app.get("/api/quality/{asset_class}/{symbol}")
+def get_symbol_quality(asset_class: str, symbol: str, limit: int = 20, db: Session = Depends(get_db)):
+    """Historique des rapports de qualité d'un symbole et barres en quarantaine"""
+    reports = (
+        db.query(models.DataQualityReport)
+        .filter(models.DataQualityReport.asset_class == asset_class, models.DataQualityReport.symbol == symbol)
+        .order_by(models.DataQualityReport.id.desc())
+        .limit(limit)
+        .all()
+    )
+    quarantined = (
+        db.query(models.QuarantinedBar)
+        .filter(models.QuarantinedBar.asset_class == asset_class, models.QuarantinedBar.symbol == symbol)
+        .order_by(models.QuarantinedBar.timestamp.desc())
+        .limit(limit)
+        .all()
+    )
+    return {
+        "reports": [_quality_report(r) for r in reports],
+        "quarantined": [
+            {
+                "timestamp": bar.timestamp,
+                "open": bar.open,
+                "high": bar.high,
+                "low": bar.low,
+                "close": bar.close,
+                "volume": bar.volume,
+                "reason": bar.reason,
+                "provider": bar.provider,
+            }
+            for bar in quarantined
+        ],
+    }
+
+
+@app.get("/api/providers/health")
+def get_providers_health():
+    """Score de santé des fournisseurs de données (ordre de préférence courant)"""
+    return get_data_loader().fetcher.health_report()
 
 
 @app.get("/api/stats")
-def get_stats(db: Session = Depends(get_db)):
+def get_stats(request: Request, db: Session = Depends(get_db)):
     """Retourne des statistiques sur les données en base"""
-    crypto_count = db.query(models.CryptoData).count()
-    stock_count = db.query(models.StockData).count()
-    
-    crypto_symbols = db.query(models.CryptoData.symbol).distinct().count()
-    stock_symbols = db.query(models.StockData.symbol).distinct().count()
-    
-    return {
-        "crypto": {
-            "total_records": crypto_count,
-            "symbols_count": crypto_symbols
-        },
-        "stocks": {
-            "total_records": stock_count,
-            "symbols_count": stock_symbols
+    fingerprint = versions.fingerprint(db)
+    last_modified = fingerprint[2]
+    etag = make_etag("stats", *fingerprint)
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    entry = response_cache.get("stats", fingerprint)
+    if entry is None:
+        crypto_count = db.query(models.CryptoData).count()
+        stock_count = db.query(models.StockData).count()
+        
+        crypto_symbols = db.query(models.CryptoData.symbol).distinct().count()
+        stock_symbols = db.query(models.StockData.symbol).distinct().count()
+        
+        stats = {
+            "crypto": {
+                "total_records": crypto_count,
+                "symbols_count": crypto_symbols
+            },
+            "stocks": {
+                "total_records": stock_count,
+                "symbols_count": stock_symbols
+            }
         }
-    }
+        entry = CachedResponse(fingerprint, etag, last_modified, json.dumps(stats).encode())
+        response_cache.put("stats", entry)
+    return json_response(entry)
+
+
+_app_imported = time.perf_counter()
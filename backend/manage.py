@@ -0,0 +1,34 @@
+"""Commandes d'administration du backend
+
+    python manage.py init-db    crée les tables manquantes (à lancer une fois par déploiement)
+"""
+import argparse
+import logging
+import time
+
+logger = logging.getLogger("manage")
+
+
+def init_db(args):
+    from database import init_schema
+
+    started = time.perf_counter()
+    init_schema()
+    logger.info(f"Schema initialise en {time.perf_counter() - started:.2f}s")
+
+
+COMMANDS = {
+    "init-db": init_db,
+}
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Administration Trading IA")
+    parser.add_argument("command", choices=list(COMMANDS))
+    args = parser.parse_args(argv)
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Métriques Prometheus et profilage à la demande des chemins critiques"""
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# --- HTTP -----------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "trading_ia_http_request_duration_seconds",
+    "Latence des requêtes HTTP par route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "trading_ia_response_cache_requests_total",
+    "Consultations du cache de réponses (hit / miss)",
+    ["result"],
+)
+
+# --- Démarrage --------------------------------------------------------------
+
+STARTUP_PHASE_DURATION = Gauge(
+    "trading_ia_startup_phase_seconds",
+    "Durée des phases de démarrage du processus (import, schema, warmup)",
+    ["phase"],
+)
+TIME_TO_READY = Gauge(
+    "trading_ia_time_to_ready_seconds",
+    "Délai entre l'import de l'application et la disponibilité (/ready)",
+)
+FIRST_REQUEST_DURATION = Gauge(
+    "trading_ia_first_request_duration_seconds",
+    "Latence de la première requête servie par route depuis le démarrage du processus",
+    ["route"],
+)
+
+# --- Fournisseurs de données ------------------------------------------------
+
+PROVIDER_FETCH_DURATION = Histogram(
+    "trading_ia_provider_fetch_duration_seconds",
+    "Durée des appels aux fournisseurs de données",
+    ["provider", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_RETRIES = Counter(
+    "trading_ia_provider_retries_total",
+    "Nouvelles tentatives auprès d'un fournisseur",
+    ["provider"],
+)
+PROVIDER_EMPTY_RESULTS = Counter(
+    "trading_ia_provider_empty_results_total",
+    "Appels fournisseur terminés sans données",
+    ["provider"],
+)
+PROVIDER_HEDGES = Counter(
+    "trading_ia_provider_hedges_total",
+    "Fournisseurs lancés en parallèle après dépassement du seuil de latence",
+    ["provider"],
+)
+PROVIDER_HEALTH_SCORE = Gauge(
+    "trading_ia_provider_health_score",
+    "Score de santé utilisé pour ordonner les fournisseurs",
+    ["provider"],
+)
+
+# --- Ingestion --------------------------------------------------------------
+
+INGEST_ROWS = Counter(
+    "trading_ia_ingest_rows_total",
+    "Lignes écrites en base par le DataLoader",
+    ["table"],
+)
+INGEST_ROWS_PER_SECOND = Histogram(
+    "trading_ia_ingest_rows_per_second",
+    "Débit de chaque chargement (lignes / durée totale)",
+    ["table"],
+    buckets=(10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000),
+)
+INGEST_STAGE_DURATION = Histogram(
+    "trading_ia_ingest_stage_duration_seconds",
+    "Durée des étapes d'un chargement (fetch, validate, transform, save, commit, listeners)",
+    ["table", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+DATA_QUALITY_ISSUES = Counter(
+    "trading_ia_data_quality_issues_total",
+    "Barres signalées par la validation, par contrôle et action appliquée",
+    ["check", "action"],
+)
+
+# --- Base de données --------------------------------------------------------
+
+DB_QUERY_DURATION = Histogram(
+    "trading_ia_db_query_duration_seconds",
+    "Durée des requêtes SQL par type d'instruction et table",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "trading_ia_db_pool_checkout_wait_seconds",
+    "Attente pour obtenir une connexion du pool (hors ouverture de nouvelles connexions)",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_CONNECT_DURATION = Histogram(
+    "trading_ia_db_connect_duration_seconds",
+    "Durée d'ouverture d'une nouvelle connexion à la base",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "trading_ia_db_pool_checked_out",
+    "Connexions actuellement empruntées au pool",
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe la durée du bloc dans l'histogramme donné"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+# --- Instrumentation SQLAlchemy ---------------------------------------------
+
+_VERB_RE = re.compile(
+    r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|BEGIN|COMMIT|ROLLBACK|CREATE|ALTER|DROP|COPY)\b",
+    re.IGNORECASE,
+)
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+\"?([a-zA-Z_][\w.]*)", re.IGNORECASE)
+
+
+def statement_label(statement: str) -> str:
+    """Réduit une requête SQL à "VERBE table" pour garder une cardinalité bornée"""
+    match = _VERB_RE.match(statement or "")
+    if not match:
+        return "OTHER"
+    verb = match.group(1).upper()
+    table = _TABLE_RE.search(statement)
+    return f"{verb} {table.group(1).lower()}" if table else verb
+
+
+def instrument_engine(engine):
+    """Branche les timings de requêtes et l'attente du pool sur un moteur SQLAlchemy"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY_DURATION.labels(statement=statement_label(statement)).observe(
+            time.perf_counter() - started
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+    # Ouverture d'une connexion : de do_connect (avant l'appel DBAPI) à l'événement connect
+    # du pool, qui partagent la même entrée de pool
+    connecting = threading.local()
+
+    @event.listens_for(engine, "do_connect")
+    def _do_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        started = connection_record.info.pop("connect_started", None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            DB_CONNECT_DURATION.observe(elapsed)
+            connecting.seconds = getattr(connecting, "seconds", 0.0) + elapsed
+
+    # SQLAlchemy n'expose pas d'événement "avant checkout" : on chronomètre Pool._do_get
+    # (API privée), qui bloque tant qu'aucune connexion n'est disponible. Il ouvre aussi les
+    # nouvelles connexions, dans le même thread : leur durée, mesurée ci-dessus, est retirée
+    # pour ne garder que l'attente. Sans _do_get, seule la durée de connexion est mesurée.
+    pool = engine.pool
+    do_get = getattr(pool, "_do_get", None)
+    if do_get is None:
+        return engine
+
+    @functools.wraps(do_get)
+    def _timed_do_get():
+        connecting.seconds = 0.0
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            waited = time.perf_counter() - started - connecting.seconds
+            DB_POOL_CHECKOUT_WAIT.observe(max(waited, 0.0))
+
+    pool._do_get = _timed_do_get
+    return engine
+
+
+# --- Profilage à la demande -------------------------------------------------
+
+class ProfilingState:
+    """Réglages du profilage par requête, modifiables à chaud via l'API"""
+
+    def __init__(self):
+        self.enabled = os.getenv("PROFILING_ENABLED", "0") == "1"
+        self.sample_rate = float(os.getenv("PROFILING_SAMPLE_RATE", "1.0"))
+        self.top = 30
+        self.profiles = deque(maxlen=int(os.getenv("PROFILING_KEEP", "20")))
+        self._lock = threading.Lock()
+
+    def should_profile(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def record(self, route: str, duration: float, profiler: cProfile.Profile):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+        with self._lock:
+            self.profiles.append({
+                "route": route,
+                "duration_ms": round(duration * 1000.0, 3),
+                "recorded_at": time.time(),
+                "stats": out.getvalue(),
+            })
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            profiles = list(self.profiles)
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "top": self.top,
+            "profiles": profiles,
+        }
+
+
+profiling = ProfilingState()
+_event_loop_profiler = threading.Lock()
+
+
+def profiled(endpoint: Callable, route: str) -> Callable:
+    """Enveloppe un endpoint pour le profiler quand le profilage est actif
+
+    Le profileur tourne dans le thread qui exécute l'endpoint (pool de threads de
+    FastAPI pour les routes synchrones), ce qu'un middleware ne permettrait pas.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            # Un seul profil à la fois sur la boucle d'événements (un profileur par thread)
+            if not profiling.should_profile() or not _event_loop_profiler.acquire(blocking=False):
+                return await endpoint(*args, **kwargs)
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+                _event_loop_profiler.release()
+                profiling.record(route, time.perf_counter() - started, profiler)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        if not profiling.should_profile():
+            return endpoint(*args, **kwargs)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiling.record(route, time.perf_counter() - started, profiler)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Classe de route FastAPI dont les endpoints sont profilables à chaud"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profiled(endpoint, path), **kwargs)
+
+
+def route_label(scope: dict) -> Optional[str]:
+    """Modèle de chemin de la route (/api/crypto/data/{symbol}) plutôt que l'URL brute"""
+    route = scope.get("route")
+    return getattr(route, "path", None)
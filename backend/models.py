@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, JSON
 from database import Base
 from datetime import datetime
 
@@ -37,3 +37,88 @@ class StockData(Base):
     __table_args__ = (
         Index('idx_stock_symbol_timestamp', 'symbol', 'timestamp'),
     )
+
+
+class SymbolVersion(Base):
+    """Filigrane de version par symbole, incrémenté à chaque chargement commité"""
+    __tablename__ = "symbol_versions"
+
+    asset_class = Column(String, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class Signal(Base):
+    """Dernier signal produit par chaque modèle pour chaque symbole"""
+    __tablename__ = "signals"
+
+    model = Column(String, primary_key=True)
+    asset_class = Column(String, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
+    value = Column(Float, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SymbolSnapshot(Base):
+    """Dernier état de chaque symbole (indicateurs et rendements récents) pour le screener"""
+    __tablename__ = "symbol_snapshots"
+
+    asset_class = Column(String, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    sma_20 = Column(Float)
+    sma_50 = Column(Float)
+    sma_200 = Column(Float)
+    rsi_14 = Column(Float)
+    ret_1d = Column(Float)
+    ret_5d = Column(Float)
+    ret_20d = Column(Float)
+    volatility_20 = Column(Float)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class QuarantinedBar(Base):
+    """Barre écartée par la validation à l'ingestion (valeurs brutes du fournisseur)"""
+    __tablename__ = "quarantined_bars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_class = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    reason = Column(String, nullable=False)
+    provider = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_quarantined_symbol', 'asset_class', 'symbol', 'timestamp'),
+    )
+
+
+class DataQualityReport(Base):
+    """Rapport de validation de chaque chargement"""
+    __tablename__ = "data_quality_reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_class = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    provider = Column(String)
+    rows_in = Column(Integer, nullable=False)
+    rows_out = Column(Integer, nullable=False)
+    quarantined = Column(Integer, nullable=False)
+    repaired = Column(Integer, nullable=False)
+    flagged = Column(Integer, nullable=False)
+    checks = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_quality_symbol', 'asset_class', 'symbol', 'created_at'),
+    )
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class CryptoDataBase(BaseModel):
@@ -37,3 +37,30 @@ class StockData(StockDataBase):
 
     class Config:
         from_attributes = True
+
+
+class Signal(BaseModel):
+    model: str
+    asset_class: str
+    symbol: str
+    timestamp: datetime
+    value: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RiskPosition(BaseModel):
+    asset_class: str
+    symbol: str
+    weight: float = Field(gt=0)
+
+
+class RiskRequest(BaseModel):
+    positions: List[RiskPosition] = Field(min_length=1)
+    lookback_days: int = Field(365, ge=30, le=3650)
+    horizon_days: int = Field(10, ge=1, le=250)
+    n_paths: int = Field(100_000, ge=1_000, le=2_000_000)
+    confidence_levels: List[float] = [0.95, 0.99]
+    seed: Optional[int] = None
@@ -1,61 +1,57 @@
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import List
+import asyncio
+from typing import Callable, List, Optional
 import logging
 from sqlalchemy.orm import Session
 import models
+import metrics
 import time
-import requests
-from pycoingecko import CoinGeckoAPI
+from services import symbols
+from services.data_version import bump_version, versions
+from services.hedged_fetcher import HedgedFetcher
+from services.providers import OHLCV_COLUMNS, MarketDataProvider, create_providers
+from services.validation import DataValidator, ValidationPolicy, ValidationResult
 
 logger = logging.getLogger(__name__)
 
-# Configuration CoinGecko
-cg = CoinGeckoAPI()
-
 
 class DataLoader:
     """Service pour charger les données historiques crypto et actions"""
     
-    # Principales cryptos avec mapping CoinGecko
-    CRYPTO_SYMBOLS = [
-        "BTC-USD", "ETH-USD", "BNB-USD", "XRP-USD", "ADA-USD",
-        "SOL-USD", "DOGE-USD", "DOT-USD", "MATIC-USD", "AVAX-USD"
-    ]
+    # Univers proposé par l'API (défini dans services.symbols, importable sans pandas)
+    CRYPTO_SYMBOLS = symbols.CRYPTO_SYMBOLS
+    FRENCH_STOCKS = symbols.FRENCH_STOCKS
+    
+    def __init__(
+        self,
+        providers: Optional[List[MarketDataProvider]] = None,
+        hedge_delay: Optional[float] = None,
+        validation_policy: Optional[ValidationPolicy] = None,
+    ):
+        # Fournisseurs enregistrés (ou injectés, ex: fournisseurs simulés pour les tests)
+        self.fetcher = HedgedFetcher(
+            providers if providers is not None else create_providers(),
+            hedge_delay=hedge_delay,
+        )
+        # Contrôles qualité appliqués entre la récupération et l'écriture
+        self.validator = DataValidator(validation_policy)
+        self.commit_listeners: List[Callable[[str, str], None]] = []
+    
+    async def close(self):
+        """Ferme les connexions gardées par les fournisseurs"""
+        await self.fetcher.close()
     
-    # Mapping Yahoo -> CoinGecko
-    COINGECKO_MAP = {
-        "BTC-USD": "bitcoin",
-        "ETH-USD": "ethereum",
-        "BNB-USD": "binancecoin",
-        "XRP-USD": "ripple",
-        "ADA-USD": "cardano",
-        "SOL-USD": "solana",
-        "DOGE-USD": "dogecoin",
-        "DOT-USD": "polkadot",
-        "MATIC-USD": "matic-network",
-        "AVAX-USD": "avalanche-2"
-    }
+    def add_commit_listener(self, listener: Callable[[str, str], None]):
+        """Enregistre listener(asset_class, symbol), appelé après chaque chargement commité"""
+        self.commit_listeners.append(listener)
     
-    # Principales actions françaises (CAC 40)
-    FRENCH_STOCKS = [
-        "MC.PA",      # LVMH
-        "OR.PA",      # L'Oréal
-        "SAN.PA",     # Sanofi
-        "TTE.PA",     # TotalEnergies
-        "AIR.PA",     # Airbus
-        "BNP.PA",     # BNP Paribas
-        "CA.PA",      # Carrefour
-        "ACA.PA",     # Crédit Agricole
-        "CS.PA",      # AXA
-        "DG.PA",      # Vinci
-        "EN.PA",      # Bouygues
-        "SGO.PA",     # Saint-Gobain
-        "RMS.PA",     # Hermès
-        "KER.PA",     # Kering
-        "UL.PA",      # Unilever
-    ]
+    async def _notify_commit(self, asset_class: str, symbol: str):
+        """Exécute les listeners dans l'ordre d'enregistrement, hors de la boucle d'événements"""
+        for listener in self.commit_listeners:
+            try:
+                await asyncio.to_thread(listener, asset_class, symbol)
+            except Exception as e:
+                # Les données sont déjà commitées : un traitement aval en échec ne doit pas faire échouer le chargement
+                logger.error(f"Erreur apres chargement de {symbol} ({getattr(listener, '__name__', listener)}): {e}")
     
     def get_available_crypto_symbols(self) -> List[str]:
         """Retourne la liste des symboles crypto disponibles"""
@@ -65,96 +61,61 @@ class DataLoader:
         """Retourne la liste des actions françaises disponibles"""
         return self.FRENCH_STOCKS
     
-    async def _load_from_coingecko(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """Charge les données depuis CoinGecko"""
-        try:
-            coin_id = self.COINGECKO_MAP.get(symbol)
-            if not coin_id:
-                return pd.DataFrame()
-            
-            # Convertir les dates en timestamps
-            start_ts = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp())
-            end_ts = int(datetime.strptime(end_date, "%Y-%m-%d").timestamp())
-            
-            # Récupérer les données depuis CoinGecko
-            logger.info(f"Recuperation depuis CoinGecko: {coin_id}")
-            data = cg.get_coin_market_chart_range_by_id(
-                id=coin_id,
-                vs_currency='usd',
-                from_timestamp=start_ts,
-                to_timestamp=end_ts
+    @staticmethod
+    def _save_quality(db: Session, asset_class: str, symbol: str, provider: str, result: ValidationResult):
+        """Ajoute le rapport de validation et les barres en quarantaine à la transaction du chargement"""
+        report = result.report
+        db.add(models.DataQualityReport(
+            asset_class=asset_class,
+            symbol=symbol,
+            provider=provider,
+            rows_in=report["rows_in"],
+            rows_out=report["rows_out"],
+            quarantined=report["quarantined"],
+            repaired=report["repaired"],
+            flagged=report["flagged"],
+            checks=report["checks"],
+        ))
+        quarantined = result.quarantined
+        if len(quarantined):
+            columns = [quarantined[c].astype(float).where(quarantined[c].notna(), None) for c in OHLCV_COLUMNS]
+            db.bulk_insert_mappings(models.QuarantinedBar, [
+                {
+                    "asset_class": asset_class,
+                    "symbol": symbol,
+                    "timestamp": timestamp.to_pydatetime(),
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "volume": volume,
+                    "reason": reason,
+                    "provider": provider,
+                }
+                for timestamp, open_, high, low, close, volume, reason in zip(
+                    quarantined.index, *columns, quarantined["reason"]
+                )
+            ])
+        if report["quarantined"] or report["checks"]:
+            logger.warning(
+                f"Qualite {symbol}: {report['quarantined']} en quarantaine, {report['repaired']} reparees, "
+                f"{report['flagged']} signalees ({', '.join(report['checks'])})"
             )
-            
-            if not data or 'prices' not in data:
-                return pd.DataFrame()
-            
-            # Convertir en DataFrame
-            prices = data['prices']
-            df = pd.DataFrame(prices, columns=['timestamp', 'close'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            # Resample par jour et calculer OHLC
-            df_daily = df.resample('D').agg({
-                'close': ['first', 'max', 'min', 'last']
-            })
-            
-            df_daily.columns = ['Open', 'High', 'Low', 'Close']
-            df_daily['Volume'] = 0  # CoinGecko gratuit ne fournit pas le volume détaillé
-            
-            # Supprimer les lignes vides
-            df_daily = df_daily.dropna()
-            
-            logger.info(f"CoinGecko: {len(df_daily)} enregistrements recuperes")
-            return df_daily
-            
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement depuis CoinGecko: {e}")
-            return pd.DataFrame()
     
-    async def _load_from_yahoo(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """Charge les données depuis Yahoo Finance avec retry et headers optimisés"""
-        try:
-            time.sleep(1)  # Délai plus long pour éviter le rate limiting
-            
-            max_retries = 3
-            df = pd.DataFrame()
-            
-            # Créer une session avec headers personnalisés
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            })
-            
-            for attempt in range(max_retries):
-                try:
-                    # Utiliser la session personnalisée
-                    ticker = yf.Ticker(symbol, session=session)
-                    df = ticker.history(start=start_date, end=end_date, interval='1d', auto_adjust=True)
-                    
-                    if not df.empty:
-                        logger.info(f"Yahoo Finance: {len(df)} enregistrements recuperes pour {symbol}")
-                        break
-                    
-                    if attempt < max_retries - 1:
-                        logger.warning(f"Yahoo tentative {attempt + 1}/{max_retries} echouee, nouvelle tentative dans 3s...")
-                        time.sleep(3)
-                except Exception as e:
-                    logger.warning(f"Erreur Yahoo tentative {attempt + 1}: {str(e)[:100]}")
-                    if attempt < max_retries - 1:
-                        time.sleep(3)
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Erreur critique lors du chargement depuis Yahoo: {e}")
-            return pd.DataFrame()
+    @staticmethod
+    def _observe_stage(table: str, stage: str, started: float) -> float:
+        """Enregistre la durée d'une étape de chargement et retourne le début de la suivante"""
+        now = time.perf_counter()
+        metrics.INGEST_STAGE_DURATION.labels(table=table, stage=stage).observe(now - started)
+        return now
+    
+    @staticmethod
+    def _observe_ingest(table: str, rows: int, started: float):
+        """Enregistre le volume et le débit d'un chargement complet"""
+        elapsed = time.perf_counter() - started
+        metrics.INGEST_ROWS.labels(table=table).inc(rows)
+        if elapsed > 0:
+            metrics.INGEST_ROWS_PER_SECOND.labels(table=table).observe(rows / elapsed)
     
     async def load_crypto_data(
         self,
@@ -163,26 +124,32 @@ class DataLoader:
         end_date: str,
         db: Session
     ) -> List[models.CryptoData]:
-        """Charge les données historiques d'une crypto via CoinGecko ou Yahoo Finance"""
+        """Charge les données historiques d'une crypto (CoinGecko, Yahoo Finance, exchange ccxt)"""
+        table = models.CryptoData.__tablename__
+        started = time.perf_counter()
         try:
             logger.info(f"Chargement des donnees crypto pour {symbol}")
             
-            # Essayer d'abord avec CoinGecko si disponible
-            if symbol in self.COINGECKO_MAP:
-                df = await self._load_from_coingecko(symbol, start_date, end_date)
-                if not df.empty:
-                    logger.info(f"Donnees chargees depuis CoinGecko pour {symbol}")
-                else:
-                    logger.warning(f"CoinGecko n'a pas retourne de donnees, essai avec Yahoo Finance")
-                    df = await self._load_from_yahoo(symbol, start_date, end_date)
-            else:
-                # Utiliser Yahoo Finance pour les symboles non supportés par CoinGecko
-                df = await self._load_from_yahoo(symbol, start_date, end_date)
+            stage = time.perf_counter()
+            # Fournisseurs crypto par ordre de santé, avec hedging en cas de lenteur
+            df, provider = await self.fetcher.fetch(symbol, start_date, end_date, "crypto")
+            stage = self._observe_stage(table, "fetch", stage)
             
             if df.empty:
                 logger.warning(f"Aucune donnee trouvee pour {symbol}")
                 return []
             
+            # Validation : barres réparées, écartées en quarantaine ou signalées
+            result = self.validator.validate(df, "crypto")
+            self._save_quality(db, "crypto", symbol, provider, result)
+            df = result.clean
+            stage = self._observe_stage(table, "validate", stage)
+            
+            if df.empty:
+                logger.warning(f"Aucune barre valide pour {symbol} apres validation")
+                db.commit()
+                return []
+            
             # Sauvegarde en base de données
             records = []
             for index, row in df.iterrows():
@@ -196,12 +163,21 @@ class DataLoader:
                     volume=float(row['Volume'])
                 )
                 records.append(crypto_data)
+            stage = self._observe_stage(table, "transform", stage)
             
             # Insertion par lot
             db.bulk_save_objects(records)
+            stage = self._observe_stage(table, "save", stage)
+            version = bump_version(db, "crypto", symbol)
             db.commit()
+            versions.record("crypto", symbol, version)
+            stage = self._observe_stage(table, "commit", stage)
+            self._observe_ingest(table, len(records), started)
+            # Traitements aval (features, signaux, snapshot) mesurés à part du chargement
+            await self._notify_commit("crypto", symbol)
+            self._observe_stage(table, "listeners", stage)
             
-            logger.info(f"OK {len(records)} enregistrements sauvegardes pour {symbol}")
+            logger.info(f"OK {len(records)} enregistrements sauvegardes pour {symbol} (source: {provider})")
             return records
             
         except Exception as e:
@@ -217,11 +193,15 @@ class DataLoader:
         db: Session
     ) -> List[models.StockData]:
         """Charge les données historiques d'une action française via Yahoo Finance"""
+        table = models.StockData.__tablename__
+        started = time.perf_counter()
         try:
             logger.info(f"Chargement des donnees boursieres pour {symbol}")
             
-            # Utiliser Yahoo Finance pour les actions
-            df = await self._load_from_yahoo(symbol, start_date, end_date)
+            stage = time.perf_counter()
+            # Fournisseurs actions (Yahoo Finance par défaut)
+            df, provider = await self.fetcher.fetch(symbol, start_date, end_date, "stocks")
+            stage = self._observe_stage(table, "fetch", stage)
             
             if df.empty:
                 logger.warning(f"Aucune donnee trouvee pour {symbol}")
@@ -229,6 +209,17 @@ class DataLoader:
                 logger.warning(f"Conseil: Testez avec BTC-USD (CoinGecko) ou executez le backend en local")
                 return []
             
+            # Validation : barres réparées, écartées en quarantaine ou signalées
+            result = self.validator.validate(df, "stocks")
+            self._save_quality(db, "stocks", symbol, provider, result)
+            df = result.clean
+            stage = self._observe_stage(table, "validate", stage)
+            
+            if df.empty:
+                logger.warning(f"Aucune barre valide pour {symbol} apres validation")
+                db.commit()
+                return []
+            
             # Sauvegarde en base de données
             records = []
             for index, row in df.iterrows():
@@ -242,12 +233,21 @@ class DataLoader:
                     volume=float(row['Volume'])
                 )
                 records.append(stock_data)
+            stage = self._observe_stage(table, "transform", stage)
             
             # Insertion par lot
             db.bulk_save_objects(records)
+            stage = self._observe_stage(table, "save", stage)
+            version = bump_version(db, "stocks", symbol)
             db.commit()
+            versions.record("stocks", symbol, version)
+            stage = self._observe_stage(table, "commit", stage)
+            self._observe_ingest(table, len(records), started)
+            # Traitements aval (features, signaux, snapshot) mesurés à part du chargement
+            await self._notify_commit("stocks", symbol)
+            self._observe_stage(table, "listeners", stage)
             
-            logger.info(f"OK {len(records)} enregistrements sauvegardes pour {symbol}")
+            logger.info(f"OK {len(records)} enregistrements sauvegardes pour {symbol} (source: {provider})")
             return records
             
         except Exception as e:
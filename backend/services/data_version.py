@@ -0,0 +1,89 @@
+"""Filigrane de version des données par symbole
+
+Le DataLoader incrémente la version d'un symbole dans la même transaction que les
+nouvelles barres ; l'API s'en sert pour les ETag et l'invalidation du cache de réponses.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import models
+
+Version = Tuple[int, Optional[datetime]]
+
+
+def bump_version(db: Session, asset_class: str, symbol: str) -> Version:
+    """Incrémente la version du symbole (à appeler avant le commit du chargement)"""
+    now = datetime.utcnow()
+    table = models.SymbolVersion.__table__
+    stmt = insert(table).values(asset_class=asset_class, symbol=symbol, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.asset_class, table.c.symbol],
+        set_={"version": table.c.version + 1, "updated_at": now},
+    ).returning(table.c.version, table.c.updated_at)
+    row = db.execute(stmt).one()
+    return row.version, row.updated_at
+
+
+class VersionCache:
+    """Copie en mémoire de symbol_versions, relue au plus une fois par TTL
+
+    Les versions incrémentées par ce processus sont visibles immédiatement (record) ;
+    celles des autres workers ou réplicas le sont après au plus `ttl` secondes.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("DATA_VERSION_TTL_SECONDS", "2.0"))
+        self._versions: Dict[Tuple[str, str], Version] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self, db: Session):
+        rows = db.query(
+            models.SymbolVersion.asset_class,
+            models.SymbolVersion.symbol,
+            models.SymbolVersion.version,
+            models.SymbolVersion.updated_at,
+        ).all()
+        versions = {(r.asset_class, r.symbol): (r.version, r.updated_at) for r in rows}
+        with self._lock:
+            # Une version publiée pendant la lecture ne doit pas être écrasée par l'ancienne
+            for key, local in self._versions.items():
+                if local[0] > versions.get(key, (0, None))[0]:
+                    versions[key] = local
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self, db: Session):
+        if time.monotonic() - self._loaded_at > self.ttl:
+            self._refresh(db)
+
+    def get(self, db: Session, asset_class: str, symbol: str) -> Version:
+        """Version courante du symbole, (0, None) s'il n'a jamais été chargé"""
+        self._ensure_fresh(db)
+        return self._versions.get((asset_class, symbol), (0, None))
+
+    def fingerprint(self, db: Session) -> Tuple[int, int, Optional[datetime]]:
+        """Version globale (nombre de symboles, somme des versions, dernière mise à jour)
+
+        Identique d'un worker à l'autre pour un même état de la base, contrairement
+        à un compteur local.
+        """
+        self._ensure_fresh(db)
+        snapshot = self._versions
+        dates = [updated_at for _, updated_at in snapshot.values() if updated_at]
+        return len(snapshot), sum(v for v, _ in snapshot.values()), max(dates) if dates else None
+
+    def record(self, asset_class: str, symbol: str, version: Version):
+        """Publie une version commitée par ce processus"""
+        with self._lock:
+            if self._versions.get((asset_class, symbol), (0, None))[0] < version[0]:
+                self._versions = {**self._versions, (asset_class, symbol): version}
+
+
+versions = VersionCache()
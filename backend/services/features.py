@@ -0,0 +1,381 @@
+"""Feature store : features d'entraînement matérialisées en fichiers mémoire-mappés
+
+Pour chaque (classe d'actif, symbole) :
+    {root}/{asset_class}/{symbol}.f32   matrice float32 [n_lignes, n_features] (row-major)
+    {root}/{asset_class}/{symbol}.ts    horodatages int64 (ns) de chaque ligne
+    {root}/{asset_class}/{symbol}.json  métadonnées (colonnes, nombre de lignes, dernière barre)
+
+Toutes les features utilisent des fenêtres finies (pas d'EMA) : recalculer les dernières
+barres à partir des WARMUP barres précédentes donne les mêmes valeurs qu'une reconstruction
+complète, ce qui permet d'ajouter les nouvelles barres en fin de fichier.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, bindparam, text
+
+logger = logging.getLogger(__name__)
+
+TABLES = {"crypto": "crypto_data", "stocks": "stock_data"}
+
+RETURN_LAGS = (1, 2, 3, 4, 5)
+RETURN_HORIZONS = (5, 10, 20)
+
+FEATURE_COLUMNS = (
+    ["ret_1"]
+    + [f"ret_1_lag{k}" for k in RETURN_LAGS]
+    + [f"ret_{h}" for h in RETURN_HORIZONS]
+    + [
+        "volatility_20",
+        "rsi_14",
+        "sma_ratio_20",
+        "sma_ratio_50",
+        "range_hl",
+        "volume_z_20",
+        "dow_sin",
+        "dow_cos",
+        "month_sin",
+        "month_cos",
+    ]
+)
+RET_1 = FEATURE_COLUMNS.index("ret_1")
+
+# Barres nécessaires avant la première ligne valide (SMA 50)
+WARMUP = 49
+
+# Incrémenté à chaque changement de calcul : les fichiers existants sont alors reconstruits
+SCHEMA_VERSION = 2
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def compute_features(bars: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Calcule les features d'une série de barres triées (colonnes timestamp, open..volume)
+
+    Retourne (horodatages int64 ns, matrice float32) sans les WARMUP premières barres.
+    """
+    if len(bars) <= WARMUP:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float32)
+
+    close = bars["close"].to_numpy(dtype=np.float64)
+    high = bars["high"].to_numpy(dtype=np.float64)
+    low = bars["low"].to_numpy(dtype=np.float64)
+    volume = bars["volume"].to_numpy(dtype=np.float64)
+    timestamps = pd.DatetimeIndex(bars["timestamp"]).as_unit("ns")
+
+    log_close = np.log(close)
+    ret_1 = np.full_like(log_close, np.nan)
+    ret_1[1:] = np.diff(log_close)
+
+    columns: Dict[str, np.ndarray] = {"ret_1": ret_1}
+    for k in RETURN_LAGS:
+        lagged = np.full_like(ret_1, np.nan)
+        lagged[k:] = ret_1[:-k]
+        columns[f"ret_1_lag{k}"] = lagged
+    for h in RETURN_HORIZONS:
+        ret_h = np.full_like(log_close, np.nan)
+        ret_h[h:] = log_close[h:] - log_close[:-h]
+        columns[f"ret_{h}"] = ret_h
+
+    columns["volatility_20"] = pd.Series(ret_1).rolling(20).std().to_numpy()
+
+    # RSI de Cutler (moyennes simples) : fenêtre finie, contrairement au RSI de Wilder
+    gains = _rolling_mean(np.clip(np.nan_to_num(ret_1), 0.0, None), 14)
+    losses = _rolling_mean(np.clip(-np.nan_to_num(ret_1), 0.0, None), 14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns["rsi_14"] = np.where(gains + losses > 0, gains / (gains + losses), 0.5)
+        columns["sma_ratio_20"] = close / _rolling_mean(close, 20) - 1.0
+        columns["sma_ratio_50"] = close / _rolling_mean(close, 50) - 1.0
+        columns["range_hl"] = (high - low) / close
+
+        log_volume = np.log1p(np.clip(volume, 0.0, None))
+        mean_v = _rolling_mean(log_volume, 20)
+        std_v = pd.Series(log_volume).rolling(20).std().to_numpy()
+        columns["volume_z_20"] = np.where(std_v > 0, (log_volume - mean_v) / std_v, 0.0)
+
+    # Calendrier de la séance (cf. validation.session_dates) : les séances de Paris sont
+    # stockées à 22h / 23h UTC la veille
+    sessions = timestamps.round("D")
+    dow = sessions.dayofweek.to_numpy()
+    month = sessions.month.to_numpy() - 1
+    columns["dow_sin"] = np.sin(2 * np.pi * dow / 7)
+    columns["dow_cos"] = np.cos(2 * np.pi * dow / 7)
+    columns["month_sin"] = np.sin(2 * np.pi * month / 12)
+    columns["month_cos"] = np.cos(2 * np.pi * month / 12)
+
+    matrix = np.column_stack([columns[name] for name in FEATURE_COLUMNS])[WARMUP:]
+    matrix = np.nan_to_num(matrix, nan=0.0, posinf=0.0, neginf=0.0).astype(np.float32)
+    return timestamps.asi8[WARMUP:].astype(np.int64), matrix
+
+
+class FeatureStore:
+    """Matérialisation incrémentale et lecture mémoire-mappée des features"""
+
+    def __init__(self, root: Optional[str] = None, workers: int = 4):
+        self.root = Path(root or os.getenv("FEATURE_STORE_DIR", "data/features"))
+        self.workers = workers
+        # Un verrou par (classe d'actif, symbole) : un ajout et une reconstruction concurrents
+        # tronqueraient et compléteraient les mêmes fichiers
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, asset_class: str, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((asset_class, symbol), threading.Lock())
+
+    @staticmethod
+    def _tmp_path(path: Path) -> Path:
+        """Fichier temporaire propre à l'appel, remplacé atomiquement par os.replace"""
+        return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+    # --- Chemins et métadonnées ---------------------------------------------
+
+    def _paths(self, asset_class: str, symbol: str) -> Dict[str, Path]:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+        base = self.root / asset_class / safe
+        return {
+            "data": base.with_suffix(".f32"),
+            "ts": base.with_suffix(".ts"),
+            "meta": base.with_suffix(".json"),
+        }
+
+    def read_meta(self, asset_class: str, symbol: str) -> Optional[dict]:
+        path = self._paths(asset_class, symbol)["meta"]
+        if not path.exists():
+            return None
+        meta = json.loads(path.read_text(encoding="utf-8"))
+        if meta.get("schema_version") != SCHEMA_VERSION or meta.get("columns") != FEATURE_COLUMNS:
+            return None
+        return meta
+
+    def _write_meta(self, paths: Dict[str, Path], meta: dict):
+        tmp = self._tmp_path(paths["meta"])
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, paths["meta"])
+
+    def list_materialized(self) -> List[dict]:
+        metas = []
+        for path in sorted(self.root.glob("*/*.json")):
+            meta = json.loads(path.read_text(encoding="utf-8"))
+            metas.append({k: meta[k] for k in ("asset_class", "symbol", "rows", "last_timestamp")})
+        return metas
+
+    # --- Lecture des barres -------------------------------------------------
+
+    @staticmethod
+    def _read_bars(conn, asset_class: str, symbol: str, since=None) -> pd.DataFrame:
+        table = TABLES[asset_class]
+        sql = f"SELECT timestamp, open, high, low, close, volume FROM {table} WHERE symbol = :symbol"
+        params = {"symbol": symbol}
+        if since is not None:
+            sql += " AND timestamp >= :since"
+            params["since"] = since
+        query = text(sql + " ORDER BY timestamp")
+        if since is not None:
+            query = query.bindparams(bindparam("since", type_=DateTime))
+        bars = pd.read_sql(query, conn, params=params, parse_dates=["timestamp"])
+        return bars.drop_duplicates("timestamp", keep="last")
+
+    @staticmethod
+    def _count_until(conn, asset_class: str, symbol: str, until) -> int:
+        table = TABLES[asset_class]
+        return conn.execute(
+            text(
+                f"SELECT count(DISTINCT timestamp) FROM {table} WHERE symbol = :symbol AND timestamp <= :until"
+            ).bindparams(bindparam("until", type_=DateTime)),
+            {"symbol": symbol, "until": until},
+        ).scalar()
+
+    @staticmethod
+    def _context_start(conn, asset_class: str, symbol: str, until):
+        """Horodatage de la WARMUP-ième barre avant `until` (contexte du calcul incrémental)"""
+        table = TABLES[asset_class]
+        return conn.execute(
+            text(
+                f"SELECT timestamp FROM {table} WHERE symbol = :symbol AND timestamp <= :until "
+                f"ORDER BY timestamp DESC LIMIT 1 OFFSET :offset"
+            ).bindparams(bindparam("until", type_=DateTime)).columns(timestamp=DateTime),
+            {"symbol": symbol, "until": until, "offset": WARMUP - 1},
+        ).scalar()
+
+    # --- Écriture -----------------------------------------------------------
+
+    def _rebuild(self, conn, asset_class: str, symbol: str) -> dict:
+        paths = self._paths(asset_class, symbol)
+        paths["data"].parent.mkdir(parents=True, exist_ok=True)
+        bars = self._read_bars(conn, asset_class, symbol)
+        timestamps, matrix = compute_features(bars)
+
+        for key, array in (("data", matrix), ("ts", timestamps)):
+            tmp = self._tmp_path(paths[key])
+            array.tofile(tmp)
+            os.replace(tmp, paths[key])
+
+        meta = {
+            "schema_version": SCHEMA_VERSION,
+            "asset_class": asset_class,
+            "symbol": symbol,
+            "columns": FEATURE_COLUMNS,
+            "rows": int(len(timestamps)),
+            "source_rows": int(len(bars)),
+            "last_timestamp": str(bars["timestamp"].iloc[-1]) if len(bars) else None,
+        }
+        self._write_meta(paths, meta)
+        return {**meta, "mode": "full", "appended": meta["rows"]}
+
+    def _append(self, conn, asset_class: str, symbol: str, meta: dict) -> Optional[dict]:
+        """Ajoute les lignes postérieures à la dernière barre ; None si une reconstruction s'impose"""
+        last = pd.Timestamp(meta["last_timestamp"]).to_pydatetime()
+        # Des barres insérées dans le passé (backfill) invalident l'ajout en fin de fichier
+        if self._count_until(conn, asset_class, symbol, last) != meta["source_rows"]:
+            return None
+
+        since = self._context_start(conn, asset_class, symbol, last)
+        bars = self._read_bars(conn, asset_class, symbol, since=since)
+        new_rows = int((bars["timestamp"] > last).sum())
+        if new_rows == 0:
+            return {**meta, "mode": "incremental", "appended": 0}
+        if since is None or len(bars) - new_rows < WARMUP:
+            return None
+
+        timestamps, matrix = compute_features(bars)
+        keep = timestamps > pd.Timestamp(last).value
+        paths = self._paths(asset_class, symbol)
+        row_bytes = len(FEATURE_COLUMNS) * 4
+        # Tronque un éventuel ajout interrompu avant d'écrire (les métadonnées font foi)
+        for key, size, array in (("data", row_bytes, matrix[keep]), ("ts", 8, timestamps[keep])):
+            with open(paths[key], "r+b") as f:
+                f.truncate(meta["rows"] * size)
+                f.seek(0, os.SEEK_END)
+                array.tofile(f)
+
+        meta = {
+            **meta,
+            "rows": meta["rows"] + int(keep.sum()),
+            "source_rows": meta["source_rows"] + new_rows,
+            "last_timestamp": str(bars["timestamp"].iloc[-1]),
+        }
+        self._write_meta(paths, meta)
+        return {**meta, "mode": "incremental", "appended": int(keep.sum())}
+
+    def update(self, engine, asset_class: str, symbol: str, full: bool = False) -> dict:
+        """Met à jour les features d'un symbole (ajout incrémental si possible)"""
+        with self._lock(asset_class, symbol), engine.connect() as conn:
+            meta = None if full else self.read_meta(asset_class, symbol)
+            result = self._append(conn, asset_class, symbol, meta) if meta and meta["rows"] else None
+            if result is None:
+                result = self._rebuild(conn, asset_class, symbol)
+        return {k: result[k] for k in ("asset_class", "symbol", "rows", "appended", "mode")}
+
+    def build(
+        self,
+        engine,
+        asset_classes: Sequence[str] = ("crypto", "stocks"),
+        symbols: Optional[Iterable[str]] = None,
+        full: bool = False,
+    ) -> dict:
+        """Met à jour un ensemble de symboles (tout l'univers stocké par défaut)"""
+        started = time.perf_counter()
+        targets: List[Tuple[str, str]] = []
+        with engine.connect() as conn:
+            for asset_class in asset_classes:
+                if symbols is not None:
+                    targets += [(asset_class, s) for s in symbols]
+                    continue
+                rows = conn.execute(text(f"SELECT DISTINCT symbol FROM {TABLES[asset_class]}"))
+                targets += [(asset_class, row[0]) for row in rows]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda t: self.update(engine, t[0], t[1], full=full), targets))
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Features: {len(results)} symboles mis a jour en {elapsed:.2f}s")
+        return {
+            "symbols": len(results),
+            "rows_appended": sum(r["appended"] for r in results),
+            "seconds": round(elapsed, 3),
+            "results": results,
+        }
+
+    # --- Lecture ------------------------------------------------------------
+
+    def open(self, asset_class: str, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(horodatages, features) mémoire-mappés en lecture seule, sans chargement en RAM"""
+        meta = self.read_meta(asset_class, symbol)
+        if not meta or meta["rows"] == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float32)
+        paths = self._paths(asset_class, symbol)
+        rows = meta["rows"]
+        timestamps = np.memmap(paths["ts"], dtype=np.int64, mode="r", shape=(rows,))
+        matrix = np.memmap(paths["data"], dtype=np.float32, mode="r", shape=(rows, len(FEATURE_COLUMNS)))
+        return timestamps, matrix
+
+    def iter_batches(
+        self,
+        keys: Sequence[Tuple[str, str]],
+        window: int = 32,
+        batch_size: int = 256,
+        horizon: int = 1,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        shuffle: bool = True,
+        seed: int = 0,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Lots (X [batch, window, n_features], y [batch]) pour l'entraînement
+
+        y est le log-rendement des `horizon` barres suivant la fenêtre. Seuls les index des
+        échantillons sont en mémoire ; les fenêtres sont lues à la demande dans les memmaps.
+        `start` / `end` restreignent la date de fin des fenêtres.
+        """
+        sources, index_parts = [], []
+        start_ns = pd.Timestamp(start).value if start else None
+        end_ns = pd.Timestamp(end).value if end else None
+        for asset_class, symbol in keys:
+            timestamps, matrix = self.open(asset_class, symbol)
+            last_end = len(timestamps) - horizon  # exclusif
+            if last_end <= window - 1:
+                continue
+            ends = np.arange(window - 1, last_end)
+            if start_ns is not None:
+                ends = ends[timestamps[ends] >= start_ns]
+            if end_ns is not None:
+                ends = ends[timestamps[ends] <= end_ns]
+            source_id = len(sources)
+            sources.append(matrix)
+            index_parts.append(np.column_stack([np.full(len(ends), source_id), ends]))
+
+        if not index_parts:
+            return
+        samples = np.concatenate(index_parts)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(samples)
+
+        offsets = np.arange(-window + 1, 1)
+        for begin in range(0, len(samples), batch_size):
+            batch = samples[begin:begin + batch_size]
+            X = np.empty((len(batch), window, len(FEATURE_COLUMNS)), dtype=np.float32)
+            y = np.empty(len(batch), dtype=np.float32)
+            # Regroupe les lectures par symbole pour des accès memmap vectorisés
+            for source_id in np.unique(batch[:, 0]):
+                rows = np.nonzero(batch[:, 0] == source_id)[0]
+                matrix = sources[source_id]
+                ends = batch[rows, 1]
+                X[rows] = matrix[ends[:, None] + offsets]
+                future = ends[:, None] + np.arange(1, horizon + 1)
+                y[rows] = matrix[future, RET_1].sum(axis=1)
+            yield X, y
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,158 @@
+"""Requêtes "hedgées" sur plusieurs fournisseurs, ordonnés par score de santé
+
+Le meilleur fournisseur démarre seul ; si sa réponse tarde au-delà d'un seuil de latence,
+le suivant est lancé en parallèle et la première réponse non vide l'emporte.
+Un échec ou un résultat vide déclenche immédiatement le fournisseur suivant.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import metrics
+from services.providers import MarketDataProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """Moyennes mobiles exponentielles du taux de succès et de la latence"""
+
+    def __init__(self, alpha: float = 0.2, prior_success: float = 0.9, prior_latency: float = 1.0):
+        self.alpha = alpha
+        self.success = prior_success
+        self.latency = prior_latency
+        self.calls = 0
+
+    def record(self, outcome: str, latency: float):
+        self.calls += 1
+        self.latency += self.alpha * (latency - self.latency)
+        # Une course perdue ne dit rien de la fiabilité, seulement de la lenteur
+        if outcome == "cancelled":
+            return
+        value = {"success": 1.0, "empty": 0.3, "error": 0.0}[outcome]
+        self.success += self.alpha * (value - self.success)
+
+    def score(self) -> float:
+        """Plus le score est élevé, plus le fournisseur est préféré"""
+        return self.success / (1.0 + self.latency)
+
+    def to_dict(self) -> dict:
+        return {
+            "success": round(self.success, 4),
+            "latency_s": round(self.latency, 4),
+            "score": round(self.score(), 4),
+            "calls": self.calls,
+        }
+
+
+class HedgedFetcher:
+    """Orchestration des fournisseurs : ordre par santé, hedging et repli"""
+
+    def __init__(
+        self,
+        providers: List[MarketDataProvider],
+        hedge_delay: Optional[float] = None,
+        min_hedge_delay: float = 0.25,
+        hedging: Optional[bool] = None,
+    ):
+        self.providers = list(providers)
+        # Sans hedging, le fournisseur suivant ne démarre qu'après un échec (repli séquentiel)
+        self.hedging = hedging if hedging is not None else os.getenv("HEDGING_ENABLED", "1") == "1"
+        self.hedge_delay = hedge_delay if hedge_delay is not None else float(os.getenv("HEDGE_DELAY_SECONDS", "2.0"))
+        self.min_hedge_delay = min_hedge_delay
+        self.health: Dict[str, ProviderHealth] = {p.name: ProviderHealth() for p in self.providers}
+
+    def ranked(self, symbol: str, asset_class: str) -> List[MarketDataProvider]:
+        """Fournisseurs compatibles, du meilleur score au moins bon (ordre d'origine à égalité)"""
+        candidates = [p for p in self.providers if p.supports(symbol, asset_class)]
+        return sorted(candidates, key=lambda p: -self.health[p.name].score())
+
+    def _delay_for(self, provider: MarketDataProvider) -> float:
+        """Seuil avant hedging : latence habituelle du fournisseur, bornée par la configuration"""
+        health = self.health[provider.name]
+        if health.calls == 0:
+            return self.hedge_delay
+        return min(self.hedge_delay, max(self.min_hedge_delay, 2.0 * health.latency))
+
+    def _record(self, provider: MarketDataProvider, outcome: str, started: float):
+        elapsed = time.perf_counter() - started
+        health = self.health[provider.name]
+        health.record(outcome, elapsed)
+        metrics.PROVIDER_FETCH_DURATION.labels(provider=provider.name, outcome=outcome).observe(elapsed)
+        metrics.PROVIDER_HEALTH_SCORE.labels(provider=provider.name).set(health.score())
+        if outcome == "empty":
+            metrics.PROVIDER_EMPTY_RESULTS.labels(provider=provider.name).inc()
+
+    async def _run(self, provider: MarketDataProvider, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        started = time.perf_counter()
+        try:
+            df = await provider.fetch(symbol, start_date, end_date)
+        except asyncio.CancelledError:
+            self._record(provider, "cancelled", started)
+            raise
+        except Exception as e:
+            logger.warning(f"{provider.name}: echec pour {symbol}: {str(e)[:200]}")
+            self._record(provider, "error", started)
+            raise
+        self._record(provider, "empty" if df is None or df.empty else "success", started)
+        return df if df is not None else pd.DataFrame()
+
+    async def fetch(
+        self, symbol: str, start_date: str, end_date: str, asset_class: str
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """Retourne (données, nom du fournisseur gagnant) ; (vide, None) si tous échouent"""
+        queue = self.ranked(symbol, asset_class)
+        running: Dict[asyncio.Task, MarketDataProvider] = {}
+
+        def launch(hedge: bool):
+            provider = queue.pop(0)
+            if hedge:
+                metrics.PROVIDER_HEDGES.labels(provider=provider.name).inc()
+                logger.info(f"Hedging: lancement de {provider.name} pour {symbol}")
+            task = asyncio.create_task(self._run(provider, symbol, start_date, end_date))
+            running[task] = provider
+            return provider
+
+        if not queue:
+            logger.warning(f"Aucun fournisseur pour {symbol} ({asset_class})")
+            return pd.DataFrame(), None
+
+        newest = launch(hedge=False)
+        try:
+            while running:
+                timeout = self._delay_for(newest) if queue and self.hedging else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Seuil de latence dépassé : on lance le fournisseur suivant en parallèle
+                    newest = launch(hedge=True)
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None and not task.result().empty:
+                        logger.info(f"Donnees chargees depuis {provider.name} pour {symbol}")
+                        return task.result(), provider.name
+                    # Échec ou résultat vide : pas la peine d'attendre le seuil
+                    if queue:
+                        newest = launch(hedge=False)
+        finally:
+            for task in running:
+                task.cancel()
+
+        logger.warning(f"Aucun fournisseur n'a retourne de donnees pour {symbol}")
+        return pd.DataFrame(), None
+
+    def health_report(self) -> Dict[str, dict]:
+        return {name: health.to_dict() for name, health in self.health.items()}
+
+    async def close(self):
+        for provider in self.providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.warning(f"Fermeture de {provider.name} impossible: {e}")
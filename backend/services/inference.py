@@ -0,0 +1,243 @@
+"""Inférence des signaux par lots sur les dernières fenêtres de features
+
+Les modèles sont chargés une seule fois (au démarrage) et restent en mémoire. Pour chaque
+modèle, les fenêtres de tous les symboles sont empilées en un seul tenseur
+[n_symboles, window, n_features] et évaluées en une passe vectorisée ; les modèles marqués
+`heavy` sont répartis sur le pool de processus, où chaque worker garde sa copie chargée.
+"""
+import logging
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from services.features import FEATURE_COLUMNS, RET_1, FeatureStore
+from services.workers import get_process_pool, worker_count
+
+logger = logging.getLogger(__name__)
+
+VOLATILITY_20 = FEATURE_COLUMNS.index("volatility_20")
+
+
+class SignalModel(ABC):
+    """Modèle de signal : fenêtres [batch, window, n_features] -> scores [batch]"""
+
+    name = "base"
+    window = 1
+    # Modèle coûteux évalué dans le pool de processus plutôt que dans le thread appelant
+    heavy = False
+    # Fichier d'origine et sa date de modification (rechargé par les workers pour les modèles lourds)
+    path: Optional[str] = None
+    mtime_ns: Optional[int] = None
+
+    @abstractmethod
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Un score par fenêtre"""
+
+
+class MomentumModel(SignalModel):
+    """Référence sans entraînement : rendement moyen de la fenêtre rapporté à la volatilité"""
+
+    name = "momentum"
+
+    def __init__(self, window: int = 20):
+        self.window = window
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        mean_return = X[:, :, RET_1].mean(axis=1)
+        volatility = X[:, -1, VOLATILITY_20]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = np.where(volatility > 0, mean_return / volatility * np.sqrt(self.window), 0.0)
+        return np.tanh(score)
+
+
+class LinearModel(SignalModel):
+    """Modèle linéaire sur la fenêtre aplatie (poids [window, n_features] + biais)"""
+
+    def __init__(self, name: str, weights: np.ndarray, bias: float = 0.0, heavy: bool = False):
+        self.name = name
+        self.weights = np.asarray(weights, dtype=np.float32)
+        if self.weights.ndim == 1:
+            self.weights = self.weights[None, :]
+        if self.weights.shape[1] != len(FEATURE_COLUMNS):
+            raise ValueError(f"{name}: {self.weights.shape[1]} poids pour {len(FEATURE_COLUMNS)} features")
+        self.window = self.weights.shape[0]
+        self.bias = float(bias)
+        self.heavy = heavy
+
+    @classmethod
+    def from_npz(cls, path: Path) -> "LinearModel":
+        data = np.load(path)
+        return cls(path.stem, data["weights"], float(data["bias"]) if "bias" in data else 0.0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.einsum("bwf,wf->b", X, self.weights) + self.bias
+
+
+# --- Exécution dans les workers du pool ----------------------------------------
+
+# Chemin -> (date de modification du fichier chargé, modèle)
+_WORKER_MODELS: Dict[str, Tuple[Optional[int], SignalModel]] = {}
+
+
+def _load_pickle(path: str) -> SignalModel:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _predict_in_worker(path: str, mtime_ns: Optional[int], X: np.ndarray) -> np.ndarray:
+    """Exécuté dans un worker : le modèle est chargé au premier appel puis gardé chaud
+
+    Il est rechargé quand le registre a chargé une autre version du fichier (`mtime_ns`).
+    """
+    entry = _WORKER_MODELS.get(path)
+    if entry is None or entry[0] != mtime_ns:
+        entry = _WORKER_MODELS[path] = (mtime_ns, _load_pickle(path))
+    return np.asarray(entry[1].predict(X), dtype=np.float64)
+
+
+class ModelRegistry:
+    """Modèles chargés une fois et gardés en mémoire
+
+    MODEL_DIR peut contenir des modèles linéaires `.npz` (weights, bias) et des instances de
+    SignalModel sérialisées en `.pkl` (predict, window et heavy sont utilisés) ; les `.pkl`
+    sont désérialisés avec pickle et doivent donc provenir d'une source de confiance. Un
+    fichier illisible ou d'un autre type est ignoré sans empêcher le chargement des autres.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.getenv("MODEL_DIR", "data/models"))
+        self.models: Dict[str, SignalModel] = {}
+
+    def register(self, model: SignalModel):
+        # Copie puis remplacement : une inférence en cours garde le dictionnaire qu'elle parcourt
+        self.models = {**self.models, model.name: model}
+
+    def load(self) -> List[str]:
+        """(Re)charge les modèles intégrés et ceux de MODEL_DIR
+
+        Le nouveau jeu de modèles remplace l'ancien en une seule affectation, une fois complet.
+        """
+        loaded: Dict[str, SignalModel] = {}
+        momentum = MomentumModel()
+        loaded[momentum.name] = momentum
+        if self.directory.exists():
+            for path in sorted(self.directory.glob("*.npz")):
+                try:
+                    model = LinearModel.from_npz(path)
+                    loaded[model.name] = model
+                except Exception as e:
+                    logger.error(f"Modele illisible {path.name}: {e}")
+            for path in sorted(self.directory.glob("*.pkl")):
+                try:
+                    model = _load_pickle(str(path))
+                except Exception as e:
+                    logger.error(f"Modele illisible {path.name}: {e}")
+                    continue
+                if not isinstance(model, SignalModel):
+                    logger.error(f"Modele ignore {path.name}: {type(model).__name__} n'est pas un SignalModel")
+                    continue
+                model.name = getattr(model, "name", None) or path.stem
+                model.path = str(path)
+                model.mtime_ns = path.stat().st_mtime_ns
+                loaded[model.name] = model
+        self.models = loaded
+        logger.info(f"Modeles charges: {sorted(self.models)}")
+        return sorted(self.models)
+
+
+class InferenceService:
+    """Calcule et stocke le dernier signal de chaque (modèle, symbole)"""
+
+    def __init__(self, store: FeatureStore, registry: ModelRegistry):
+        self.store = store
+        self.registry = registry
+
+    def latest_windows(
+        self, keys: Sequence[Tuple[str, str]], window: int
+    ) -> Tuple[List[Tuple[str, str, int]], np.ndarray]:
+        """Empile la dernière fenêtre de chaque symbole : ([(asset, symbol, ts_ns)], X)"""
+        rows, windows = [], []
+        for asset_class, symbol in keys:
+            timestamps, matrix = self.store.open(asset_class, symbol)
+            if len(timestamps) < window:
+                continue
+            rows.append((asset_class, symbol, int(timestamps[-1])))
+            windows.append(matrix[-window:])
+        if not windows:
+            return [], np.empty((0, window, len(FEATURE_COLUMNS)), dtype=np.float32)
+        return rows, np.stack(windows)
+
+    @staticmethod
+    def predict(model: SignalModel, X: np.ndarray) -> np.ndarray:
+        """Passe vectorisée, ou découpage du lot sur le pool pour les modèles lourds"""
+        if len(X) == 0:
+            return np.empty(0)
+        if not model.heavy or model.path is None:
+            return np.asarray(model.predict(X), dtype=np.float64)
+        pool = get_process_pool()
+        chunks = np.array_split(X, min(worker_count(), len(X)))
+        futures = [pool.submit(_predict_in_worker, model.path, model.mtime_ns, chunk) for chunk in chunks]
+        return np.concatenate([f.result() for f in futures])
+
+    def _all_keys(self, engine) -> List[Tuple[str, str]]:
+        keys = []
+        with engine.connect() as conn:
+            for asset_class, table in (("crypto", "crypto_data"), ("stocks", "stock_data")):
+                rows = conn.execute(text(f"SELECT DISTINCT symbol FROM {table}"))
+                keys += [(asset_class, row[0]) for row in rows]
+        return keys
+
+    def run(self, engine, keys: Optional[Sequence[Tuple[str, str]]] = None) -> dict:
+        """Inférence de tous les modèles sur les symboles donnés (tous par défaut)"""
+        started = time.perf_counter()
+        keys = list(keys) if keys is not None else self._all_keys(engine)
+        created_at = datetime.utcnow()
+        records = []
+        models_snapshot = list(self.registry.models.values())
+        for model in models_snapshot:
+            rows, X = self.latest_windows(keys, model.window)
+            scores = self.predict(model, X)
+            records += [
+                {
+                    "model": model.name,
+                    "asset_class": asset_class,
+                    "symbol": symbol,
+                    "timestamp": datetime.utcfromtimestamp(ts / 1e9),
+                    "value": float(score),
+                    "created_at": created_at,
+                }
+                for (asset_class, symbol, ts), score in zip(rows, scores)
+            ]
+        inference_s = time.perf_counter() - started
+
+        if records:
+            table = models.Signal.__table__
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.model, table.c.asset_class, table.c.symbol],
+                set_={c: stmt.excluded[c] for c in ("timestamp", "value", "created_at")},
+            )
+            with engine.begin() as conn:
+                conn.execute(stmt, records)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "models": len(models_snapshot),
+            "symbols": len(keys),
+            "signals": len(records),
+            "inference_s": round(inference_s, 4),
+            "seconds": round(elapsed, 4),
+            "signals_per_sec": round(len(records) / inference_s, 1) if inference_s > 0 else None,
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,342 @@
+"""Fournisseurs de données de marché interchangeables
+
+Chaque fournisseur retourne un DataFrame indexé par date (UTC naïf) avec les colonnes
+Open, High, Low, Close, Volume ; un DataFrame vide signifie "pas de données".
+"""
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+
+import pandas as pd
+import requests
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Mapping Yahoo -> CoinGecko
+COINGECKO_MAP = {
+    "BTC-USD": "bitcoin",
+    "ETH-USD": "ethereum",
+    "BNB-USD": "binancecoin",
+    "XRP-USD": "ripple",
+    "ADA-USD": "cardano",
+    "SOL-USD": "solana",
+    "DOGE-USD": "dogecoin",
+    "DOT-USD": "polkadot",
+    "MATIC-USD": "matic-network",
+    "AVAX-USD": "avalanche-2"
+}
+
+PROVIDER_TYPES: Dict[str, Type["MarketDataProvider"]] = {}
+
+
+def register_provider(cls: Type["MarketDataProvider"]) -> Type["MarketDataProvider"]:
+    """Décorateur d'enregistrement d'une implémentation sous son nom"""
+    PROVIDER_TYPES[cls.name] = cls
+    return cls
+
+
+def create_providers(names: Optional[List[str]] = None) -> List["MarketDataProvider"]:
+    """Instancie les fournisseurs enregistrés, dans l'ordre de préférence initial
+
+    Par défaut l'ordre vient de la variable MARKET_DATA_PROVIDERS (ex: "coingecko,yahoo,ccxt").
+    """
+    if names is None:
+        names = os.getenv("MARKET_DATA_PROVIDERS", "coingecko,yahoo,ccxt").split(",")
+    providers = []
+    for name in (n.strip() for n in names):
+        if not name:
+            continue
+        if name not in PROVIDER_TYPES:
+            raise ValueError(f"Fournisseur inconnu: {name} (disponibles: {sorted(PROVIDER_TYPES)})")
+        providers.append(PROVIDER_TYPES[name]())
+    return providers
+
+
+def _to_timestamp(date: str) -> int:
+    return int(datetime.strptime(date, "%Y-%m-%d").timestamp())
+
+
+class MarketDataProvider(ABC):
+    """Interface commune des sources de données OHLCV"""
+
+    name: str = "abstract"
+    asset_classes: Tuple[str, ...] = ()
+
+    def supports(self, symbol: str, asset_class: str) -> bool:
+        """Indique si le fournisseur peut servir ce symbole"""
+        return asset_class in self.asset_classes
+
+    @abstractmethod
+    async def fetch(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Retourne les barres journalières entre start_date et end_date (YYYY-MM-DD)"""
+
+    async def close(self):
+        """Libère les connexions gardées entre deux appels (arrêt de l'application)"""
+
+
+@register_provider
+class CoinGeckoProvider(MarketDataProvider):
+    """Prix CoinGecko rééchantillonnés en barres journalières"""
+
+    name = "coingecko"
+    asset_classes = ("crypto",)
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from pycoingecko import CoinGeckoAPI
+            self._client = CoinGeckoAPI()
+        return self._client
+
+    def supports(self, symbol: str, asset_class: str) -> bool:
+        return asset_class == "crypto" and symbol in COINGECKO_MAP
+
+    async def fetch(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        coin_id = COINGECKO_MAP.get(symbol)
+        if not coin_id:
+            return pd.DataFrame()
+
+        logger.info(f"Recuperation depuis CoinGecko: {coin_id}")
+        data = await asyncio.to_thread(
+            self.client.get_coin_market_chart_range_by_id,
+            id=coin_id,
+            vs_currency='usd',
+            from_timestamp=_to_timestamp(start_date),
+            to_timestamp=_to_timestamp(end_date),
+        )
+
+        if not data or 'prices' not in data:
+            return pd.DataFrame()
+
+        # Convertir en DataFrame
+        df = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        volumes = pd.DataFrame(data.get('total_volumes') or [], columns=['timestamp', 'volume'])
+        volumes['timestamp'] = pd.to_datetime(volumes['timestamp'], unit='ms')
+        df = df.join(volumes.set_index('timestamp')['volume'], how='left')
+
+        # Resample par jour et calculer OHLC ; total_volumes est un volume glissant sur 24h,
+        # sa dernière valeur du jour correspond au volume de la journée
+        df_daily = df.resample('D').agg({
+            'close': ['first', 'max', 'min', 'last'],
+            'volume': 'last',
+        })
+        df_daily.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        df_daily = self._complete_days(df, df_daily)
+
+        # Supprimer les jours sans cotation (les trous restants sont signalés par la validation)
+        df_daily = df_daily.dropna(subset=['Open', 'High', 'Low', 'Close'])
+        df_daily['Volume'] = df_daily['Volume'].fillna(0.0)
+        df_daily = df_daily[OHLCV_COLUMNS]
+
+        logger.info(f"CoinGecko: {len(df_daily)} enregistrements recuperes")
+        return df_daily
+
+    @staticmethod
+    def _complete_days(samples: pd.DataFrame, daily: pd.DataFrame) -> pd.DataFrame:
+        """Retire les journées partielles aux extrémités de la période
+
+        Sous 90 jours CoinGecko renvoie des points horaires : le premier et le dernier jour
+        peuvent ne couvrir que quelques heures, ce qui fausse open/high/low. Le jour en cours
+        (non clôturé) est toujours retiré.
+        """
+        if daily.empty:
+            return daily
+        today = pd.Timestamp.now('UTC').tz_localize(None).normalize()
+        daily = daily[daily.index < today]
+        if len(samples) < 2 or daily.empty:
+            return daily
+        step = samples.index.to_series().diff().median()
+        if step >= pd.Timedelta(hours=12):
+            # Granularité journalière : un point par jour, rien de partiel
+            return daily
+        first, last = samples.index[0], samples.index[-1]
+        if first - first.normalize() > step:
+            daily = daily[daily.index != first.normalize()]
+        if last.normalize() + pd.Timedelta(days=1) - last > step * 2:
+            daily = daily[daily.index != last.normalize()]
+        return daily
+
+
+@register_provider
+class YahooProvider(MarketDataProvider):
+    """Yahoo Finance avec retry à backoff exponentiel non bloquant"""
+
+    name = "yahoo"
+    asset_classes = ("crypto", "stocks")
+
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, min_interval: float = 1.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Espacement minimal entre deux appels pour éviter le rate limiting,
+        # appliqué seulement quand les appels se suivent de près
+        self.min_interval = min_interval
+        self._last_call = 0.0
+        self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update(self.HEADERS)
+        return self._session
+
+    async def _throttle(self):
+        wait = self._last_call + self.min_interval - time.monotonic()
+        self._last_call = time.monotonic() + max(wait, 0.0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol, session=self.session)
+        return ticker.history(start=start_date, end=end_date, interval='1d', auto_adjust=True)
+
+    async def fetch(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        df = pd.DataFrame()
+        for attempt in range(self.max_retries):
+            await self._throttle()
+            try:
+                df = await asyncio.to_thread(self._history, symbol, start_date, end_date)
+                if not df.empty:
+                    logger.info(f"Yahoo Finance: {len(df)} enregistrements recuperes pour {symbol}")
+                    break
+                logger.warning(f"Yahoo tentative {attempt + 1}/{self.max_retries} sans donnees pour {symbol}")
+            except Exception as e:
+                logger.warning(f"Erreur Yahoo tentative {attempt + 1}: {str(e)[:100]}")
+                if attempt == self.max_retries - 1:
+                    raise
+            if attempt < self.max_retries - 1:
+                metrics.PROVIDER_RETRIES.labels(provider=self.name).inc()
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+        if df.empty:
+            return df
+        # Index naïf en UTC, comme les autres fournisseurs
+        if df.index.tz is not None:
+            df.index = df.index.tz_convert("UTC").tz_localize(None)
+        return df[OHLCV_COLUMNS]
+
+
+@register_provider
+class CcxtProvider(MarketDataProvider):
+    """Klines d'un exchange via ccxt, pages récupérées en parallèle
+
+    Les paires sont cotées en USDT, assimilé au dollar : les prix sont servis tels quels sous
+    le symbole `XXX-USD`. Le volume de l'exchange, exprimé en actif de base, est converti en
+    devise de cotation (volume x clôture) pour rester homogène avec CoinGecko et Yahoo, qui
+    renvoient un volume en dollars.
+
+    L'exchange et ses marchés (exchangeInfo, plusieurs Mo chez Binance et coûteux en quota)
+    sont chargés au premier appel puis réutilisés ; ils sont liés à la boucle d'événements
+    qui les a créés et rechargés si elle change.
+    """
+
+    name = "ccxt"
+    asset_classes = ("crypto",)
+
+    TIMEFRAME = "1d"
+    TIMEFRAME_MS = 24 * 60 * 60 * 1000
+
+    def __init__(
+        self,
+        exchange_id: Optional[str] = None,
+        quote: str = "USDT",
+        page_limit: int = 1000,
+        max_parallel_pages: int = 4,
+    ):
+        self.exchange_id = exchange_id or os.getenv("CCXT_EXCHANGE", "binance")
+        self.quote = quote
+        self.page_limit = page_limit
+        self.max_parallel_pages = max_parallel_pages
+        self._exchange = None
+        self._exchange_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._exchange_lock: Optional[asyncio.Lock] = None
+
+    async def _get_exchange(self):
+        """Exchange partagé, marchés chargés une seule fois par boucle d'événements"""
+        import ccxt.async_support as ccxt_async
+
+        loop = asyncio.get_running_loop()
+        if self._exchange_loop is not loop:
+            # Une session aiohttp n'est pas utilisable depuis une autre boucle
+            self._exchange = None
+            self._exchange_loop = loop
+            self._exchange_lock = asyncio.Lock()
+        async with self._exchange_lock:
+            if self._exchange is None:
+                exchange = getattr(ccxt_async, self.exchange_id)({"enableRateLimit": True})
+                try:
+                    await exchange.load_markets()
+                except Exception:
+                    await exchange.close()
+                    raise
+                self._exchange = exchange
+                logger.info(f"ccxt/{self.exchange_id}: {len(exchange.markets)} marches charges")
+        return self._exchange
+
+    async def close(self):
+        exchange, self._exchange = self._exchange, None
+        if exchange is not None and self._exchange_loop is asyncio.get_running_loop():
+            await exchange.close()
+
+    def market_symbol(self, symbol: str) -> Optional[str]:
+        """BTC-USD -> BTC/USDT"""
+        base, sep, quote = symbol.partition("-")
+        if not sep or quote not in ("USD", "USDT"):
+            return None
+        return f"{base}/{self.quote}"
+
+    def supports(self, symbol: str, asset_class: str) -> bool:
+        return asset_class == "crypto" and self.market_symbol(symbol) is not None
+
+    def page_starts(self, start_ms: int, end_ms: int) -> List[int]:
+        """Début de chaque page de `page_limit` barres couvrant [start_ms, end_ms["""
+        step = self.page_limit * self.TIMEFRAME_MS
+        return list(range(start_ms, end_ms, step))
+
+    async def fetch(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        market = self.market_symbol(symbol)
+        start_ms = _to_timestamp(start_date) * 1000
+        end_ms = _to_timestamp(end_date) * 1000
+        exchange = await self._get_exchange()
+        semaphore = asyncio.Semaphore(self.max_parallel_pages)
+
+        async def fetch_page(since: int):
+            async with semaphore:
+                return await exchange.fetch_ohlcv(market, self.TIMEFRAME, since=since, limit=self.page_limit)
+
+        pages = await asyncio.gather(*(fetch_page(since) for since in self.page_starts(start_ms, end_ms)))
+
+        rows = [row for page in pages for row in page if row[0] < end_ms]
+        if not rows:
+            return pd.DataFrame()
+
+        df = pd.DataFrame(rows, columns=["timestamp", *OHLCV_COLUMNS])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        df = df.drop_duplicates("timestamp").set_index("timestamp").sort_index()
+        df["Volume"] = df["Volume"] * df["Close"]
+        logger.info(f"ccxt/{self.exchange_id}: {len(df)} enregistrements recuperes pour {market}")
+        return df
@@ -0,0 +1,102 @@
+"""Cache de réponses sérialisées et requêtes conditionnelles (ETag / Last-Modified)"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Hashable, Optional
+
+from fastapi import Request, Response
+
+import metrics
+
+
+class CachedResponse:
+    __slots__ = ("version", "etag", "last_modified", "body")
+
+    def __init__(self, version, etag: str, last_modified: Optional[datetime], body: bytes):
+        self.version = version
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+
+class ResponseCache:
+    """LRU de corps JSON déjà sérialisés, valides tant que la version ne change pas"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                metrics.RESPONSE_CACHE_REQUESTS.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(key)
+        metrics.RESPONSE_CACHE_REQUESTS.labels(result="hit").inc()
+        return entry
+
+    def put(self, key: Hashable, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(*parts) -> str:
+    """ETag fort dérivé de la version des données et des paramètres de la requête"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # no-cache : le client garde la réponse mais revalide à chaque fois (304 si inchangée)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Évalue If-None-Match puis, à défaut, If-Modified-Since (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates or "*" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
+
+
+def json_response(entry: CachedResponse) -> Response:
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers=cache_headers(entry.etag, entry.last_modified),
+    )
+
+
+response_cache = ResponseCache()
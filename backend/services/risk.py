@@ -0,0 +1,278 @@
+"""Risque de portefeuille : VaR / CVaR historiques et Monte Carlo, distribution des drawdowns
+
+Les rendements journaliers sont dérivés des clôtures de `crypto_data` et `stock_data`,
+alignées sur les dates communes à tous les symboles (les cryptos cotant aussi le week-end,
+leur mouvement du week-end est reporté sur la séance suivante). La matrice de rendements
+est gardée en cache tant que la version des données des symboles ne change pas.
+
+La simulation tire des rendements log-normaux corrélés (décomposition de Cholesky de la
+covariance historique) et suit un portefeuille acheté puis conservé sur l'horizon. Les
+trajectoires sont réparties sur le pool de processus, chaque tâche les générant par blocs
+dont la taille est bornée par RISK_CHUNK_BYTES.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.orm import Session
+
+from services.data_version import versions
+from services.features import TABLES
+from services.workers import get_process_pool, worker_count
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+DRAWDOWN_PERCENTILES = (50, 90, 95, 99)
+
+# Nombre minimal de rendements communs pour estimer une covariance
+MIN_OBSERVATIONS = 30
+
+
+@dataclass
+class ReturnMatrix:
+    """Log-rendements journaliers alignés [n_dates, n_symboles] et leurs moments"""
+
+    keys: Tuple[Key, ...]
+    dates: np.ndarray
+    returns: np.ndarray
+    mean: np.ndarray
+    cholesky: np.ndarray
+
+
+def _cholesky(cov: np.ndarray) -> np.ndarray:
+    """Cholesky de la covariance, avec un léger renfort de la diagonale si elle est singulière
+
+    (symboles parfaitement corrélés, ou plus de symboles que d'observations)
+    """
+    jitter = 0.0
+    scale = float(np.mean(np.diag(cov))) or 1e-12
+    for _ in range(8):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = scale * 1e-10 if jitter == 0.0 else jitter * 100
+    raise ValueError("Covariance des rendements non definie positive")
+
+
+def build_return_matrix(db: Session, keys: Sequence[Key], lookback_days: int) -> ReturnMatrix:
+    """Lit les clôtures des symboles et calcule les log-rendements sur les dates communes"""
+    since = datetime.utcnow() - timedelta(days=lookback_days)
+    closes = {}
+    conn = db.connection()
+    for asset_class, table in TABLES.items():
+        symbols = [symbol for a, symbol in keys if a == asset_class]
+        if not symbols:
+            continue
+        query = text(
+            f"SELECT symbol, timestamp, close FROM {table} "
+            f"WHERE symbol IN :symbols AND timestamp >= :since"
+        ).bindparams(bindparam("symbols", expanding=True), bindparam("since", type_=DateTime))
+        bars = pd.read_sql(query, conn, params={"symbols": symbols, "since": since}, parse_dates=["timestamp"])
+        # Date de séance comme validation.session_dates : les séances de Paris sont stockées
+        # à 22h / 23h UTC la veille, un normalize() les décalerait d'un jour face aux cryptos
+        bars["date"] = bars["timestamp"].dt.round("D")
+        pivot = bars.sort_values("timestamp").pivot_table(
+            index="date", columns="symbol", values="close", aggfunc="last"
+        )
+        for symbol in symbols:
+            if symbol not in pivot:
+                raise ValueError(f"Aucune donnee pour {asset_class}/{symbol} sur {lookback_days} jours")
+            closes[(asset_class, symbol)] = pivot[symbol]
+
+    prices = pd.DataFrame({key: closes[key] for key in keys}).dropna(how="any")
+    if (prices <= 0).any().any():
+        raise ValueError("Clotures nulles ou negatives dans l'historique")
+    returns = np.diff(np.log(prices.to_numpy(dtype=np.float64)), axis=0)
+    if len(returns) < MIN_OBSERVATIONS:
+        raise ValueError(
+            f"Historique commun insuffisant: {len(returns)} rendements (minimum {MIN_OBSERVATIONS})"
+        )
+    cov = np.atleast_2d(np.cov(returns, rowvar=False))
+    return ReturnMatrix(
+        keys=tuple(keys),
+        dates=prices.index.to_numpy()[1:],
+        returns=returns,
+        mean=returns.mean(axis=0),
+        cholesky=_cholesky(cov),
+    )
+
+
+class ReturnMatrixCache:
+    """Matrices de rendements par (symboles, lookback), invalidées par la version des données"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("RISK_CACHE_SIZE", "32"))
+        self._entries: "OrderedDict[tuple, Tuple[tuple, ReturnMatrix]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, keys: Sequence[Key], lookback_days: int) -> Tuple[ReturnMatrix, bool]:
+        """(matrice, servie depuis le cache)"""
+        cache_key = (tuple(keys), lookback_days)
+        data_version = tuple(versions.get(db, asset_class, symbol)[0] for asset_class, symbol in keys)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == data_version:
+                self._entries.move_to_end(cache_key)
+                return entry[1], True
+
+        matrix = build_return_matrix(db, keys, lookback_days)
+        with self._lock:
+            self._entries[cache_key] = (data_version, matrix)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return matrix, False
+
+
+def _var_cvar(portfolio_returns: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """VaR et CVaR (pertes positives) au niveau de confiance donné"""
+    threshold = np.quantile(portfolio_returns, 1.0 - confidence)
+    tail = portfolio_returns[portfolio_returns <= threshold]
+    return float(-threshold), float(-tail.mean()) if len(tail) else float(-threshold)
+
+
+def historical_risk(
+    matrix: ReturnMatrix, weights: np.ndarray, horizon_days: int, confidence_levels: Sequence[float]
+) -> dict:
+    """VaR / CVaR sur les rendements historiques cumulés par fenêtres glissantes de l'horizon"""
+    cumulative = np.cumsum(np.vstack([np.zeros(len(weights)), matrix.returns]), axis=0)
+    window_returns = cumulative[horizon_days:] - cumulative[:-horizon_days]
+    if len(window_returns) == 0:
+        raise ValueError(f"Historique plus court que l'horizon ({horizon_days} jours)")
+    portfolio = np.expm1(window_returns) @ weights
+    return {
+        "observations": len(portfolio),
+        "levels": {
+            str(c): dict(zip(("var", "cvar"), _var_cvar(portfolio, c))) for c in confidence_levels
+        },
+    }
+
+
+def _chunk_size(n_assets: int, horizon_days: int) -> int:
+    budget = int(os.getenv("RISK_CHUNK_BYTES", str(64 * 1024 * 1024)))
+    return max(1, budget // (4 * n_assets * horizon_days))
+
+
+def simulate_paths(
+    mean: np.ndarray,
+    cholesky: np.ndarray,
+    weights: np.ndarray,
+    horizon_days: int,
+    n_paths: int,
+    seed: np.random.SeedSequence,
+    chunk_size: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rendement final et drawdown maximal de `n_paths` trajectoires du portefeuille
+
+    Exécuté dans les workers ; la mémoire est bornée par `chunk_size` trajectoires à la fois.
+    """
+    n_assets = len(weights)
+    chunk_size = chunk_size or _chunk_size(n_assets, horizon_days)
+    rng = np.random.default_rng(seed)
+    mean = mean.astype(np.float32)
+    chol_t = cholesky.T.astype(np.float32)
+    weights = weights.astype(np.float32)
+    terminal = np.empty(n_paths, dtype=np.float32)
+    drawdown = np.empty(n_paths, dtype=np.float32)
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        shocks = rng.standard_normal((size * horizon_days, n_assets), dtype=np.float32)
+        log_returns = (shocks @ chol_t).reshape(size, horizon_days, n_assets)
+        log_returns += mean
+        np.cumsum(log_returns, axis=1, out=log_returns)
+        np.exp(log_returns, out=log_returns)
+        # Valeur du portefeuille acheté puis conservé, valeur initiale 1
+        value = log_returns @ weights
+        peak = np.maximum(np.maximum.accumulate(value, axis=1), 1.0)
+        terminal[start:start + size] = value[:, -1] - 1.0
+        drawdown[start:start + size] = (1.0 - value / peak).max(axis=1)
+    return terminal, drawdown
+
+
+def monte_carlo_risk(
+    matrix: ReturnMatrix,
+    weights: np.ndarray,
+    horizon_days: int,
+    n_paths: int,
+    confidence_levels: Sequence[float],
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """VaR / CVaR Monte Carlo et distribution des drawdowns, trajectoires réparties sur le pool"""
+    started = time.perf_counter()
+    n_tasks = max(1, min(workers or worker_count(), n_paths))
+    sizes = [len(part) for part in np.array_split(np.arange(n_paths), n_tasks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    args = (matrix.mean, matrix.cholesky, weights, horizon_days)
+
+    if n_tasks == 1:
+        parts = [simulate_paths(*args, sizes[0], seeds[0])]
+    else:
+        pool = get_process_pool()
+        futures = [pool.submit(simulate_paths, *args, size, s) for size, s in zip(sizes, seeds)]
+        parts = [f.result() for f in futures]
+
+    terminal = np.concatenate([p[0] for p in parts]).astype(np.float64)
+    drawdown = np.concatenate([p[1] for p in parts]).astype(np.float64)
+    percentiles = np.percentile(drawdown, DRAWDOWN_PERCENTILES)
+    return {
+        "paths": n_paths,
+        "tasks": n_tasks,
+        "seconds": round(time.perf_counter() - started, 4),
+        "levels": {
+            str(c): dict(zip(("var", "cvar"), _var_cvar(terminal, c))) for c in confidence_levels
+        },
+        "expected_return": float(terminal.mean()),
+        "drawdown": {
+            "mean": float(drawdown.mean()),
+            "percentiles": {str(p): float(v) for p, v in zip(DRAWDOWN_PERCENTILES, percentiles)},
+        },
+    }
+
+
+def portfolio_risk(
+    db: Session,
+    positions: Sequence[Tuple[str, str, float]],
+    lookback_days: int = 365,
+    horizon_days: int = 10,
+    n_paths: int = 100_000,
+    confidence_levels: Sequence[float] = (0.95, 0.99),
+    seed: Optional[int] = None,
+) -> dict:
+    """Risque d'un portefeuille [(asset_class, symbol, poids)] ; les poids sont normalisés"""
+    weights_by_key: Dict[Key, float] = {}
+    for asset_class, symbol, weight in positions:
+        if asset_class not in TABLES:
+            raise ValueError(f"asset_class inconnue: {asset_class}")
+        weights_by_key[(asset_class, symbol)] = weights_by_key.get((asset_class, symbol), 0.0) + weight
+    keys = sorted(weights_by_key)
+    weights = np.array([weights_by_key[k] for k in keys], dtype=np.float64)
+    if weights.sum() <= 0:
+        raise ValueError("La somme des poids doit etre positive")
+    weights /= weights.sum()
+
+    matrix, cached = return_matrices.get(db, keys, lookback_days)
+    return {
+        "symbols": [{"asset_class": a, "symbol": s, "weight": float(w)} for (a, s), w in zip(keys, weights)],
+        "observations": len(matrix.returns),
+        "start_date": str(pd.Timestamp(matrix.dates[0]).date()),
+        "end_date": str(pd.Timestamp(matrix.dates[-1]).date()),
+        "horizon_days": horizon_days,
+        "returns_cached": cached,
+        "historical": historical_risk(matrix, weights, horizon_days, confidence_levels),
+        "monte_carlo": monte_carlo_risk(matrix, weights, horizon_days, n_paths, confidence_levels, seed),
+    }
+
+
+return_matrices = ReturnMatrixCache()
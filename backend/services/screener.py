@@ -0,0 +1,509 @@
+"""Screener : filtres sur le dernier état de chaque symbole
+
+La table `symbol_snapshots` garde, par symbole, la dernière clôture, les moyennes mobiles,
+le RSI, les rendements récents et la volatilité. Elle est recalculée pour le seul symbole
+chargé après chaque commit du DataLoader (à partir de ses SNAPSHOT_BARS dernières barres),
+si bien qu'un filtre parcourt une ligne par symbole et jamais l'historique des barres.
+
+Syntaxe des requêtes (mots-clés insensibles à la casse) :
+
+    RSI(14) < 30 and close > SMA(200)
+    RETURN(20) in top decile
+    (ret_5d > 5% or volatility_20 < 0.01) and not close < 0.9 * sma_50
+    volume in bottom 25%
+
+Les classements (top/bottom decile, quintile, quartile ou N%) sont calculés avec
+percent_rank() sur l'univers filtré par asset_class ; les valeurs manquantes sont exclues.
+"""
+import functools
+import logging
+import re
+import time
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, func, literal, not_, or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from services.features import TABLES
+
+logger = logging.getLogger(__name__)
+
+# Barres relues pour recalculer un snapshot (SMA 200 et convergence du RSI de Wilder)
+SNAPSHOT_BARS = 400
+
+FIELDS = (
+    "close",
+    "volume",
+    "sma_20",
+    "sma_50",
+    "sma_200",
+    "rsi_14",
+    "ret_1d",
+    "ret_5d",
+    "ret_20d",
+    "volatility_20",
+)
+
+FIELD_ALIASES = {"price": "close"}
+
+# Forme fonction : NOM(période) -> colonne
+FUNCTIONS = {
+    "sma": {20: "sma_20", 50: "sma_50", 200: "sma_200"},
+    "rsi": {14: "rsi_14"},
+    "return": {1: "ret_1d", 5: "ret_5d", 20: "ret_20d"},
+    "ret": {1: "ret_1d", 5: "ret_5d", 20: "ret_20d"},
+    "volatility": {20: "volatility_20"},
+    "vol": {20: "volatility_20"},
+}
+
+BUCKETS = {"decile": 0.1, "quintile": 0.2, "quartile": 0.25}
+
+KEYWORDS = {"and", "or", "not", "in", "top", "bottom"}
+
+
+class ScreenerError(ValueError):
+    """Requête de screener invalide (message destiné à l'utilisateur)"""
+
+
+# --- Calcul des snapshots ------------------------------------------------------
+
+
+def _wilder_rsi(close: np.ndarray, period: int = 14) -> Optional[float]:
+    if len(close) <= period:
+        return None
+    delta = np.diff(close)
+    gains, losses = np.clip(delta, 0.0, None), np.clip(-delta, 0.0, None)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    if avg_gain + avg_loss == 0:
+        return 50.0
+    return float(100.0 * avg_gain / (avg_gain + avg_loss))
+
+
+def compute_snapshot(bars: pd.DataFrame) -> Optional[dict]:
+    """Indicateurs à la dernière barre d'une série triée (colonnes timestamp, close, volume)
+
+    Les rendements sont simples (0.05 = +5 %), la volatilité est l'écart-type des
+    log-rendements journaliers sur 20 barres, le RSI est celui de Wilder (0-100).
+    """
+    if bars.empty:
+        return None
+    close = bars["close"].to_numpy(dtype=np.float64)
+    n = len(close)
+
+    def sma(window):
+        return float(close[-window:].mean()) if n >= window else None
+
+    def ret(horizon):
+        return float(close[-1] / close[-1 - horizon] - 1.0) if n > horizon and close[-1 - horizon] > 0 else None
+
+    volatility = None
+    if n > 20 and (close[-21:] > 0).all():
+        volatility = float(np.diff(np.log(close[-21:])).std(ddof=1))
+
+    return {
+        "timestamp": pd.Timestamp(bars["timestamp"].iloc[-1]).to_pydatetime(),
+        "close": float(close[-1]),
+        "volume": float(bars["volume"].iloc[-1]),
+        "sma_20": sma(20),
+        "sma_50": sma(50),
+        "sma_200": sma(200),
+        "rsi_14": _wilder_rsi(close),
+        "ret_1d": ret(1),
+        "ret_5d": ret(5),
+        "ret_20d": ret(20),
+        "volatility_20": volatility,
+    }
+
+
+def _read_recent_bars(conn, asset_class: str, symbol: str) -> pd.DataFrame:
+    table = TABLES[asset_class]
+    bars = pd.read_sql(
+        text(
+            f"SELECT timestamp, close, volume FROM {table} WHERE symbol = :symbol "
+            f"ORDER BY timestamp DESC LIMIT :limit"
+        ),
+        conn,
+        params={"symbol": symbol, "limit": SNAPSHOT_BARS},
+        parse_dates=["timestamp"],
+    )
+    return bars.drop_duplicates("timestamp").iloc[::-1].reset_index(drop=True)
+
+
+def _upsert_snapshots(conn, records: List[dict]):
+    table = models.SymbolSnapshot.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.asset_class, table.c.symbol],
+        set_={c: stmt.excluded[c] for c in ("timestamp", *FIELDS, "updated_at")},
+    )
+    conn.execute(stmt, records)
+
+
+def update_snapshot(engine, asset_class: str, symbol: str) -> Optional[dict]:
+    """Recalcule le snapshot d'un symbole (appelé après chaque chargement)"""
+    with engine.begin() as conn:
+        snapshot = compute_snapshot(_read_recent_bars(conn, asset_class, symbol))
+        if snapshot is None:
+            return None
+        record = {"asset_class": asset_class, "symbol": symbol, **snapshot, "updated_at": datetime.utcnow()}
+        _upsert_snapshots(conn, [record])
+    return record
+
+
+def rebuild_snapshots(engine, asset_classes: Sequence[str] = tuple(TABLES)) -> dict:
+    """Recalcule les snapshots de tous les symboles stockés (initialisation, réparation)"""
+    started = time.perf_counter()
+    records = []
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for asset_class in asset_classes:
+            symbols = conn.execute(text(f"SELECT DISTINCT symbol FROM {TABLES[asset_class]}")).scalars().all()
+            for symbol in symbols:
+                snapshot = compute_snapshot(_read_recent_bars(conn, asset_class, symbol))
+                if snapshot is not None:
+                    records.append({"asset_class": asset_class, "symbol": symbol, **snapshot, "updated_at": now})
+        if records:
+            _upsert_snapshots(conn, records)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Screener: {len(records)} snapshots recalcules en {elapsed:.2f}s")
+    return {"symbols": len(records), "seconds": round(elapsed, 3)}
+
+
+# --- Analyse des requêtes ------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?%?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<op><=|>=|!=|<>|==|[<>=+\-*/(),])"
+    r")"
+)
+
+_COMPARATORS = {"<", "<=", ">", ">=", "=", "==", "!=", "<>"}
+
+
+def _tokenize(query: str) -> List[Tuple[str, object, int]]:
+    tokens, pos = [], 0
+    query = query.rstrip()
+    while pos < len(query):
+        match = _TOKEN_RE.match(query, pos)
+        if match is None or match.end() == pos:
+            raise ScreenerError(f"Caractere inattendu en position {pos}: {query[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        raw = match.group(kind)
+        if kind == "number":
+            value = float(raw.rstrip("%")) / (100.0 if raw.endswith("%") else 1.0)
+            tokens.append(("number", value, match.start(kind)))
+        elif kind == "name" and raw.lower() in KEYWORDS:
+            tokens.append(("keyword", raw.lower(), match.start(kind)))
+        else:
+            tokens.append((kind, raw, match.start(kind)))
+        pos = match.end()
+    tokens.append(("end", None, len(query)))
+    return tokens
+
+
+class _Parser:
+    """Descente récursive ; chaque règle retourne (noeud, type) avec type 'bool' ou 'num'
+
+    Noeuds : ("num", v), ("field", nom), ("neg", x), ("arith", op, a, b), ("cmp", op, a, b),
+    ("and", a, b), ("or", a, b), ("not", x), ("rank", "top"|"bottom", fraction, x)
+    """
+
+    def __init__(self, query: str):
+        self.tokens = _tokenize(query)
+        self.pos = 0
+
+    def peek(self, offset: int = 0):
+        return self.tokens[self.pos + offset]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def accept(self, kind: str, value=None) -> bool:
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value=None, what: str = ""):
+        token = self.peek()
+        if not self.accept(kind, value):
+            found = "fin de requete" if token[0] == "end" else repr(token[1])
+            raise ScreenerError(f"{what or value or kind} attendu en position {token[2]}, trouve {found}")
+        return token
+
+    def parse(self, expected: str = "bool"):
+        node, kind = self.or_expr()
+        if self.peek()[0] != "end":
+            token = self.peek()
+            raise ScreenerError(f"Element inattendu en position {token[2]}: {token[1]!r}")
+        if kind != expected:
+            raise ScreenerError(
+                "La requete doit etre une condition (ex: RSI(14) < 30)" if expected == "bool"
+                else "Une expression numerique est attendue"
+            )
+        return node
+
+    @staticmethod
+    def _require(kind: str, expected: str, op: str):
+        if kind != expected:
+            raise ScreenerError(
+                f"'{op}' attend une condition de chaque cote" if expected == "bool"
+                else f"'{op}' attend une valeur numerique de chaque cote"
+            )
+
+    def or_expr(self):
+        node, kind = self.and_expr()
+        while self.accept("keyword", "or"):
+            right, right_kind = self.and_expr()
+            self._require(kind, "bool", "or")
+            self._require(right_kind, "bool", "or")
+            node = ("or", node, right)
+        return node, kind
+
+    def and_expr(self):
+        node, kind = self.not_expr()
+        while self.accept("keyword", "and"):
+            right, right_kind = self.not_expr()
+            self._require(kind, "bool", "and")
+            self._require(right_kind, "bool", "and")
+            node = ("and", node, right)
+        return node, kind
+
+    def not_expr(self):
+        if self.accept("keyword", "not"):
+            node, kind = self.not_expr()
+            self._require(kind, "bool", "not")
+            return ("not", node), "bool"
+        return self.predicate()
+
+    def predicate(self):
+        left, kind = self.additive()
+        token = self.peek()
+        if token[0] == "op" and token[1] in _COMPARATORS:
+            self.next()
+            right, right_kind = self.additive()
+            self._require(kind, "num", token[1])
+            self._require(right_kind, "num", token[1])
+            return ("cmp", token[1], left, right), "bool"
+        if self.accept("keyword", "in"):
+            self._require(kind, "num", "in")
+            return self.rank(left), "bool"
+        return left, kind
+
+    def rank(self, operand):
+        token = self.peek()
+        if not (self.accept("keyword", "top") or self.accept("keyword", "bottom")):
+            raise ScreenerError(f"'top' ou 'bottom' attendu apres 'in' (position {token[2]})")
+        direction = token[1]
+        bucket = self.next()
+        if bucket[0] == "number" and 0 < bucket[1] < 1:
+            # "in top 10%" : le nombre a déjà été converti en fraction
+            fraction = bucket[1]
+        elif bucket[0] == "name" and bucket[1].lower() in BUCKETS:
+            fraction = BUCKETS[bucket[1].lower()]
+        else:
+            raise ScreenerError(
+                f"decile, quintile, quartile ou pourcentage (ex: 10%) attendu en position {bucket[2]}"
+            )
+        return ("rank", direction, fraction, operand)
+
+    def additive(self):
+        node, kind = self.multiplicative()
+        while self.peek()[0] == "op" and self.peek()[1] in ("+", "-"):
+            op = self.next()[1]
+            right, right_kind = self.multiplicative()
+            self._require(kind, "num", op)
+            self._require(right_kind, "num", op)
+            node = ("arith", op, node, right)
+        return node, kind
+
+    def multiplicative(self):
+        node, kind = self.unary()
+        while self.peek()[0] == "op" and self.peek()[1] in ("*", "/"):
+            op = self.next()[1]
+            right, right_kind = self.unary()
+            self._require(kind, "num", op)
+            self._require(right_kind, "num", op)
+            node = ("arith", op, node, right)
+        return node, kind
+
+    def unary(self):
+        if self.accept("op", "-"):
+            node, kind = self.unary()
+            self._require(kind, "num", "-")
+            return ("neg", node), "num"
+        return self.primary()
+
+    def primary(self):
+        token = self.next()
+        kind, value, position = token
+        if kind == "number":
+            return ("num", value), "num"
+        if kind == "op" and value == "(":
+            node = self.or_expr()
+            self.expect("op", ")", "')'")
+            return node
+        if kind == "name":
+            name = value.lower()
+            if self.accept("op", "("):
+                period = self.expect("number", what="periode")[1]
+                self.expect("op", ")", "')'")
+                return ("field", self._function(name, period, position)), "num"
+            name = FIELD_ALIASES.get(name, name)
+            if name not in FIELDS:
+                raise ScreenerError(
+                    f"Champ inconnu {value!r} en position {position} (champs: {', '.join(FIELDS)})"
+                )
+            return ("field", name), "num"
+        found = "fin de requete" if kind == "end" else repr(value)
+        raise ScreenerError(f"Valeur attendue en position {position}, trouve {found}")
+
+    @staticmethod
+    def _function(name: str, period: float, position: int) -> str:
+        periods = FUNCTIONS.get(name)
+        if periods is None:
+            raise ScreenerError(
+                f"Fonction inconnue {name.upper()} en position {position} "
+                f"(fonctions: {', '.join(f.upper() for f in FUNCTIONS)})"
+            )
+        if period not in periods:
+            supported = ", ".join(str(p) for p in periods)
+            raise ScreenerError(f"{name.upper()}({period:g}) non disponible (periodes: {supported})")
+        return periods[period]
+
+
+@functools.lru_cache(maxsize=256)
+def parse_query(query: str) -> tuple:
+    """Arbre de la condition (mis en cache : les mêmes filtres reviennent souvent)"""
+    if not query or not query.strip():
+        raise ScreenerError("Requete vide")
+    return _Parser(query).parse("bool")
+
+
+@functools.lru_cache(maxsize=64)
+def parse_expression(expression: str) -> tuple:
+    return _Parser(expression).parse("num")
+
+
+# --- Traduction SQL ------------------------------------------------------------
+
+
+def _collect_ranks(node: tuple, ranks: List[tuple]):
+    if node[0] == "rank":
+        if node[3] not in ranks:
+            ranks.append(node[3])
+        return
+    for child in node[1:]:
+        if isinstance(child, tuple):
+            _collect_ranks(child, ranks)
+
+
+def _to_sql(node: tuple, columns, ranks: List[tuple]):
+    kind = node[0]
+    if kind == "num":
+        return literal(node[1])
+    if kind == "field":
+        return columns[node[1]]
+    if kind == "neg":
+        return -_to_sql(node[1], columns, ranks)
+    if kind == "arith":
+        left, right = _to_sql(node[2], columns, ranks), _to_sql(node[3], columns, ranks)
+        if node[1] == "+":
+            return left + right
+        if node[1] == "-":
+            return left - right
+        if node[1] == "*":
+            return left * right
+        return left / func.nullif(right, 0)
+    if kind == "cmp":
+        left, right = _to_sql(node[2], columns, ranks), _to_sql(node[3], columns, ranks)
+        op = node[1]
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        if op == ">=":
+            return left >= right
+        if op in ("=", "=="):
+            return left == right
+        return left != right
+    if kind == "and":
+        return and_(_to_sql(node[1], columns, ranks), _to_sql(node[2], columns, ranks))
+    if kind == "or":
+        return or_(_to_sql(node[1], columns, ranks), _to_sql(node[2], columns, ranks))
+    if kind == "not":
+        return not_(_to_sql(node[1], columns, ranks))
+    if kind == "rank":
+        _, direction, fraction, operand = node
+        rank = columns[f"rank_{ranks.index(operand)}"]
+        bound = rank >= 1.0 - fraction if direction == "top" else rank <= fraction
+        return and_(_to_sql(operand, columns, ranks).isnot(None), bound)
+    raise ScreenerError(f"Noeud inconnu: {kind}")
+
+
+def screen(
+    db,
+    query: str,
+    asset_class: Optional[str] = None,
+    sort: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 100,
+) -> dict:
+    """Symboles dont le dernier snapshot vérifie la requête"""
+    started = time.perf_counter()
+    condition = parse_query(query)
+    order = parse_expression(sort) if sort else None
+
+    table = models.SymbolSnapshot.__table__
+    ranks: List[tuple] = []
+    _collect_ranks(condition, ranks)
+
+    universe = select(
+        table,
+        *[
+            func.percent_rank().over(
+                partition_by=_to_sql(operand, table.c, ranks).is_(None),
+                order_by=_to_sql(operand, table.c, ranks),
+            ).label(f"rank_{i}")
+            for i, operand in enumerate(ranks)
+        ],
+    )
+    if asset_class:
+        universe = universe.where(table.c.asset_class == asset_class)
+    universe = universe.subquery("universe")
+
+    columns = universe.c
+    # count(*) over () est évalué avant le LIMIT : nombre total de symboles retenus
+    stmt = select(
+        *[columns[c.name] for c in table.c], func.count().over().label("total")
+    ).where(_to_sql(condition, columns, ranks))
+    if order is not None:
+        key = _to_sql(order, columns, ranks)
+        stmt = stmt.order_by((key.desc() if descending else key.asc()).nulls_last())
+    stmt = stmt.order_by(columns.asset_class, columns.symbol).limit(limit)
+
+    rows = [dict(row._mapping) for row in db.execute(stmt)]
+    total = rows[0]["total"] if rows else 0
+    for row in rows:
+        del row["total"]
+    return {
+        "query": query,
+        "count": total,
+        "returned": len(rows),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        "results": rows,
+    }
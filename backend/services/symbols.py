@@ -0,0 +1,26 @@
+"""Univers de symboles proposés par l'API (sans dépendance lourde : servi dès le démarrage)"""
+
+# Principales cryptos
+CRYPTO_SYMBOLS = [
+    "BTC-USD", "ETH-USD", "BNB-USD", "XRP-USD", "ADA-USD",
+    "SOL-USD", "DOGE-USD", "DOT-USD", "MATIC-USD", "AVAX-USD"
+]
+
+# Principales actions françaises (CAC 40)
+FRENCH_STOCKS = [
+    "MC.PA",      # LVMH
+    "OR.PA",      # L'Oréal
+    "SAN.PA",     # Sanofi
+    "TTE.PA",     # TotalEnergies
+    "AIR.PA",     # Airbus
+    "BNP.PA",     # BNP Paribas
+    "CA.PA",      # Carrefour
+    "ACA.PA",     # Crédit Agricole
+    "CS.PA",      # AXA
+    "DG.PA",      # Vinci
+    "EN.PA",      # Bouygues
+    "SGO.PA",     # Saint-Gobain
+    "RMS.PA",     # Hermès
+    "KER.PA",     # Kering
+    "UL.PA",      # Unilever
+]
@@ -0,0 +1,295 @@
+"""Validation et réparation des barres entre la récupération et l'écriture en base
+
+Tous les contrôles opèrent sur des tableaux numpy (aucune boucle par ligne) :
+
+    duplicate      horodatage en double (la dernière occurrence est gardée)
+    invalid        prix non finis ou <= 0, volume négatif ou non fini
+    ohlc           high < max(open, close, low) ou low > min(open, close, high)
+    off_calendar   barre hors du calendrier de l'actif (week-end ou jour férié Euronext pour les actions)
+    gap            séances du calendrier absentes entre la première et la dernière barre (rapport seul)
+    spike          aller-retour aberrant d'une barre (saut puis retour de sens opposé)
+    jump           saut aberrant non suivi d'un retour (changement de niveau)
+    stale          clôture identique répétée sur au moins `stale_run` barres
+    zero_volume    volume nul
+
+Chaque contrôle est associé à une action : repair (corrige la barre), quarantine (l'écarte
+vers la table quarantined_bars), flag (l'écrit en la comptant dans le rapport) ou ignore.
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from services.providers import OHLCV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("repair", "quarantine", "flag", "ignore")
+
+# Actions possibles par contrôle (une barre invalide ne peut pas être écrite telle quelle)
+ALLOWED_ACTIONS = {
+    "duplicate": ("repair", "quarantine"),
+    "invalid": ("quarantine",),
+    "ohlc": ("repair", "quarantine", "flag", "ignore"),
+    "off_calendar": ("quarantine", "flag", "ignore"),
+    "gap": ("flag", "ignore"),
+    "spike": ("quarantine", "flag", "ignore"),
+    "jump": ("quarantine", "flag", "ignore"),
+    "stale": ("quarantine", "flag", "ignore"),
+    "zero_volume": ("quarantine", "flag", "ignore"),
+}
+
+DEFAULT_ACTIONS = {
+    "duplicate": "repair",
+    "invalid": "quarantine",
+    "ohlc": "repair",
+    "off_calendar": "flag",
+    "gap": "flag",
+    "spike": "quarantine",
+    "jump": "flag",
+    "stale": "flag",
+    "zero_volume": "flag",
+}
+
+# Nombre de dates manquantes détaillées dans le rapport
+MISSING_SAMPLE = 20
+
+
+@dataclass
+class ValidationPolicy:
+    """Action par contrôle et seuils ; surchargeable par variables d'environnement
+
+    DATA_QUALITY_POLICY="spike=flag,zero_volume=quarantine" modifie les actions par défaut.
+    """
+
+    actions: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_ACTIONS))
+    # Un saut est aberrant s'il dépasse `outlier_z` écarts robustes (MAD) et `min_jump` en log-rendement
+    outlier_z: float = 10.0
+    min_jump: float = 0.15
+    stale_run: int = 5
+
+    def __post_init__(self):
+        for check, action in self.actions.items():
+            if check not in ALLOWED_ACTIONS:
+                raise ValueError(f"Controle inconnu: {check} (controles: {', '.join(ALLOWED_ACTIONS)})")
+            if action not in ALLOWED_ACTIONS[check]:
+                raise ValueError(
+                    f"Action {action!r} impossible pour {check} (actions: {', '.join(ALLOWED_ACTIONS[check])})"
+                )
+
+    @classmethod
+    def from_env(cls) -> "ValidationPolicy":
+        actions = dict(DEFAULT_ACTIONS)
+        for item in os.getenv("DATA_QUALITY_POLICY", "").split(","):
+            if item.strip():
+                check, _, action = item.partition("=")
+                actions[check.strip()] = action.strip()
+        return cls(
+            actions=actions,
+            outlier_z=float(os.getenv("DATA_QUALITY_OUTLIER_Z", "10")),
+            min_jump=float(os.getenv("DATA_QUALITY_MIN_JUMP", "0.15")),
+            stale_run=int(os.getenv("DATA_QUALITY_STALE_RUN", "5")),
+        )
+
+
+@dataclass
+class ValidationResult:
+    clean: pd.DataFrame
+    quarantined: pd.DataFrame
+    report: dict
+
+
+# --- Calendriers ---------------------------------------------------------------
+
+
+def _easter(year: int) -> date:
+    """Dimanche de Pâques (algorithme de Meeus / Jones / Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=64)
+def euronext_holidays(year: int) -> tuple:
+    """Jours de fermeture d'Euronext Paris (hors fermetures exceptionnelles)"""
+    easter = pd.Timestamp(_easter(year))
+    return (
+        pd.Timestamp(year, 1, 1),
+        easter - pd.Timedelta(days=2),  # Vendredi saint
+        easter + pd.Timedelta(days=1),  # Lundi de Pâques
+        pd.Timestamp(year, 5, 1),
+        pd.Timestamp(year, 12, 25),
+        pd.Timestamp(year, 12, 26),
+    )
+
+
+def trading_days(asset_class: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    """Séances attendues entre deux dates : tous les jours pour les cryptos, jours ouvrés Euronext sinon"""
+    if asset_class == "crypto":
+        return pd.date_range(start, end, freq="D")
+    holidays = [d for year in range(start.year, end.year + 1) for d in euronext_holidays(year)]
+    return pd.bdate_range(start, end, freq="C", holidays=holidays)
+
+
+def session_dates(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Date de séance de chaque barre
+
+    Les fournisseurs renvoient des horodatages UTC naïfs : une séance de Paris commençant à
+    minuit local apparaît à 22h ou 23h UTC la veille, d'où l'arrondi au jour le plus proche.
+    """
+    return index.round("D")
+
+
+# --- Contrôles -------------------------------------------------------------------
+
+
+def _run_lengths(same_as_previous: np.ndarray) -> np.ndarray:
+    """Longueur de la série de valeurs identiques à laquelle appartient chaque élément"""
+    run_id = np.cumsum(~same_as_previous)
+    return np.bincount(run_id)[run_id]
+
+
+def _return_outliers(close: np.ndarray, outlier_z: float, min_jump: float):
+    """(spike, jump) : masques des barres atteintes par un saut aberrant de clôture"""
+    n = len(close)
+    spike = np.zeros(n, dtype=bool)
+    jump = np.zeros(n, dtype=bool)
+    if n < 3:
+        return spike, jump
+    returns = np.diff(np.log(close))
+    deviation = np.abs(returns - np.median(returns))
+    scale = 1.4826 * np.median(deviation)
+    if scale == 0:
+        scale = returns.std() or 1.0
+    extreme = (deviation > outlier_z * scale) & (np.abs(returns) > min_jump)
+    # returns[i] relie la barre i à la barre i + 1
+    reverses = np.sign(returns[:-1]) != np.sign(returns[1:])
+    spike[1:-1] = extreme[:-1] & extreme[1:] & reverses
+    # Ni l'entrée ni la sortie d'un spike ne sont des changements de niveau
+    jump[1:] = extreme & ~spike[1:] & ~spike[:-1]
+    return spike, jump
+
+
+class DataValidator:
+    """Applique la politique de validation à un DataFrame OHLCV de fournisseur"""
+
+    def __init__(self, policy: Optional[ValidationPolicy] = None):
+        self.policy = policy or ValidationPolicy.from_env()
+
+    def validate(self, df: pd.DataFrame, asset_class: str) -> ValidationResult:
+        started = time.perf_counter()
+        actions = self.policy.actions
+        rows_in = len(df)
+        df = df.sort_index(kind="stable")
+        checks: Dict[str, dict] = {}
+        quarantined: List[pd.DataFrame] = []
+
+        # Doublons : la dernière version de la barre fait foi
+        duplicate = df.index.duplicated(keep="last")
+        if duplicate.any():
+            checks["duplicate"] = {"count": int(duplicate.sum()), "action": actions["duplicate"]}
+            if actions["duplicate"] == "quarantine":
+                quarantined.append(df[duplicate].assign(reason="duplicate"))
+            df = df[~duplicate]
+
+        values = df[OHLCV_COLUMNS].to_numpy(dtype=np.float64, copy=True)
+        open_, high, low, close, volume = values.T
+        n = len(values)
+
+        with np.errstate(invalid="ignore"):
+            invalid = ~np.isfinite(values).all(axis=1) | (values[:, :4] <= 0).any(axis=1) | (volume < 0)
+            valid = ~invalid
+            body_high = np.maximum(np.maximum(open_, close), low)
+            body_low = np.minimum(np.minimum(open_, close), high)
+            masks = {
+                "invalid": invalid,
+                "ohlc": valid & ((high < body_high) | (low > body_low)),
+                "zero_volume": valid & (volume == 0),
+            }
+
+        sessions = session_dates(df.index)
+        if n:
+            expected = trading_days(asset_class, sessions.min(), sessions.max())
+            masks["off_calendar"] = valid & ~sessions.isin(expected)
+            missing = expected.difference(sessions[valid])
+        else:
+            masks["off_calendar"] = np.zeros(0, dtype=bool)
+            missing = pd.DatetimeIndex([])
+
+        # Contrôles de série sur les seules barres valides
+        positions = np.flatnonzero(valid)
+        valid_close = close[positions]
+        spike, jump = _return_outliers(valid_close, self.policy.outlier_z, self.policy.min_jump)
+        # Vide si aucune barre n'est valide (tout part alors en quarantaine via `invalid`)
+        same = np.zeros(len(valid_close), dtype=bool)
+        same[1:] = valid_close[1:] == valid_close[:-1]
+        stale = same & (_run_lengths(same) >= self.policy.stale_run)
+        for name, series_mask in (("spike", spike), ("jump", jump), ("stale", stale)):
+            mask = np.zeros(n, dtype=bool)
+            mask[positions[series_mask]] = True
+            masks[name] = mask
+
+        quarantine = np.zeros(n, dtype=bool)
+        repaired = np.zeros(n, dtype=bool)
+        flagged = np.zeros(n, dtype=bool)
+        reasons = np.full(n, "", dtype=object)
+        for name, mask in masks.items():
+            action = actions[name]
+            count = int(mask.sum())
+            if action == "ignore" or count == 0:
+                continue
+            checks[name] = {"count": count, "action": action}
+            if action == "quarantine":
+                quarantine |= mask
+                reasons[mask] = reasons[mask] + (name + ",")
+            elif action == "repair":
+                repaired |= mask
+            else:
+                flagged |= mask
+
+        if repaired.any():
+            # Seule l'incohérence OHLC est réparable barre à barre : high / low englobent open et close
+            values[:, 1] = np.where(repaired, np.maximum(body_high, high), high)
+            values[:, 2] = np.where(repaired, np.minimum(body_low, low), low)
+
+        if actions["gap"] != "ignore" and len(missing):
+            checks["gap"] = {
+                "count": len(missing),
+                "action": actions["gap"],
+                "missing": [d.strftime("%Y-%m-%d") for d in missing[:MISSING_SAMPLE]],
+            }
+
+        frame = pd.DataFrame(values, index=df.index, columns=OHLCV_COLUMNS)
+        clean = frame[~quarantine]
+        if quarantine.any():
+            quarantined.append(df[quarantine].assign(reason=[r.rstrip(",") for r in reasons[quarantine]]))
+
+        for name, check in checks.items():
+            metrics.DATA_QUALITY_ISSUES.labels(check=name, action=check["action"]).inc(check["count"])
+
+        quarantined_df = pd.concat(quarantined) if quarantined else frame.iloc[:0].assign(reason="")
+        report = {
+            "rows_in": rows_in,
+            "rows_out": len(clean),
+            "quarantined": len(quarantined_df),
+            "repaired": int((repaired & ~quarantine).sum()),
+            "flagged": int((flagged & ~quarantine).sum()),
+            "checks": checks,
+            "seconds": round(time.perf_counter() - started, 6),
+        }
+        return ValidationResult(clean=clean, quarantined=quarantined_df, report=report)
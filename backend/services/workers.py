@@ -0,0 +1,37 @@
+"""Pool de processus partagé pour les calculs lourds (inférence, simulations)"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Les requêtes synchrones et les listeners de chargement appellent le pool depuis des threads
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    return int(os.getenv("WORKER_PROCESSES", str(max(1, (os.cpu_count() or 2) - 1))))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Pool créé à la première utilisation puis réutilisé (les workers gardent leurs caches)"""
+    global _pool
+    pool = _pool
+    if pool is not None:
+        return pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count())
+            logger.info(f"Pool de processus demarre ({worker_count()} workers)")
+        return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1 @@
+# Suite de benchmarks Trading IA
@@ -0,0 +1,112 @@
+"""Latence p50/p99 des routes de lecture sous concurrence"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+
+from benchmarks.common import latency_summary
+from benchmarks.synthetic import seed_symbol
+
+logger = logging.getLogger(__name__)
+
+
+def default_routes(limit: int = 1000) -> List[Tuple[str, str, dict]]:
+    """(nom, chemin, paramètres) des routes mesurées, sur les symboles synthétiques"""
+    symbol = seed_symbol(0)
+    return [
+        ("crypto_data", f"/api/crypto/data/{symbol}", {"limit": limit}),
+        ("stocks_data", f"/api/stocks/data/{symbol}", {"limit": limit}),
+        ("stats", "/api/stats", {}),
+    ]
+
+
+def _request_factory(mode: str, backend_url: str, path: str, params: dict, timeout: float):
+    """Paramètres et en-têtes de la i-ème requête selon le mode mesuré
+
+    - cached : requête identique répétée (servie par le cache de réponses)
+    - uncached : `limit` différent à chaque requête, donc requête SQL + sérialisation
+    - conditional : revalidation avec If-None-Match (réponse 304 sans corps)
+    """
+    if mode == "uncached":
+        limit = params.get("limit", 1000)
+        return lambda i: ({**params, "limit": limit - (i % 997)}, {})
+    if mode == "conditional":
+        etag = requests.get(f"{backend_url}{path}", params=params, timeout=timeout).headers.get("ETag")
+        return lambda i: (params, {"If-None-Match": etag} if etag else {})
+    return lambda i: (params, {})
+
+
+def _measure_route(
+    backend_url: str, path: str, params: dict, concurrency: int, n_requests: int, timeout: float,
+    mode: str = "cached",
+) -> Dict[str, object]:
+    local = threading.local()
+    errors = []
+    make_request = _request_factory(mode, backend_url, path, params, timeout)
+
+    def one_call(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        call_params, headers = make_request(i or 0)
+        started = time.perf_counter()
+        try:
+            response = session.get(f"{backend_url}{path}", params=call_params, headers=headers, timeout=timeout)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if not ok:
+            errors.append(elapsed)
+        return elapsed
+
+    # Échauffement (connexions, caches du planificateur Postgres)
+    for _ in range(min(concurrency, 5)):
+        one_call(None)
+    errors.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one_call, range(n_requests)))
+    wall = time.perf_counter() - started
+
+    summary = latency_summary(latencies)
+    summary.update({
+        "mode": mode,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "requests_per_sec": round(n_requests / wall, 1) if wall > 0 else None,
+    })
+    return summary
+
+
+def run_api_benchmark(
+    backend_url: str,
+    concurrency_levels: List[int],
+    n_requests: int = 200,
+    limit: int = 1000,
+    timeout: float = 30.0,
+) -> Dict[str, object]:
+    """Interroge un backend en cours d'exécution (après `run.py seed`)"""
+    try:
+        requests.get(f"{backend_url}/health", timeout=5).raise_for_status()
+    except requests.RequestException as e:
+        return {"skipped": f"backend injoignable sur {backend_url}: {e}"}
+
+    results: Dict[str, object] = {"backend_url": backend_url, "n_requests": n_requests, "routes": {}}
+    for name, path, params in default_routes(limit):
+        modes = ("cached", "conditional") if not params else ("cached", "uncached", "conditional")
+        per_mode = {}
+        for mode in modes:
+            per_level = {}
+            for concurrency in concurrency_levels:
+                summary = _measure_route(backend_url, path, params, concurrency, n_requests, timeout, mode)
+                per_level[str(concurrency)] = summary
+                logger.info(f"API {name}/{mode} c={concurrency}: p50={summary['p50_ms']}ms "
+                            f"p99={summary['p99_ms']}ms")
+            per_mode[mode] = per_level
+        results["routes"][name] = {"path": path, "params": params, "modes": per_mode}
+    return results
@@ -0,0 +1,45 @@
+"""Reconstruction du feature store et débit du générateur de lots"""
+import logging
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.common import ensure_backend_path
+
+logger = logging.getLogger(__name__)
+
+
+def run_features_benchmark(window: int = 32, batch_size: int = 512, max_batches: int = 200) -> Dict[str, object]:
+    """Reconstruit tout l'univers stocké (données seedées comprises) dans un répertoire temporaire"""
+    ensure_backend_path()
+    from database import engine
+    from services.features import FeatureStore
+
+    with tempfile.TemporaryDirectory(prefix="features-bench-") as root:
+        store = FeatureStore(root)
+        full = store.build(engine, full=True)
+        noop = store.build(engine)
+        logger.info(f"Features: rebuild {full['symbols']} symboles en {full['seconds']}s")
+
+        keys = [(r["asset_class"], r["symbol"]) for r in full["results"] if r["rows"] > window]
+        samples, batches = 0, 0
+        started = time.perf_counter()
+        for X, y in store.iter_batches(keys, window=window, batch_size=batch_size):
+            samples += len(y)
+            batches += 1
+            if batches >= max_batches:
+                break
+        elapsed = time.perf_counter() - started
+
+    return {
+        "symbols": full["symbols"],
+        "feature_rows": sum(r["rows"] for r in full["results"]),
+        "full_rebuild_s": full["seconds"],
+        "incremental_noop_s": noop["seconds"],
+        "batches": {
+            "window": window,
+            "batch_size": batch_size,
+            "batches": batches,
+            "samples_per_sec": round(samples / elapsed, 1) if elapsed > 0 else None,
+        },
+    }
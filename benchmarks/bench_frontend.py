@@ -0,0 +1,62 @@
+"""Temps de construction du graphique en chandeliers du frontend"""
+import importlib.util
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from benchmarks.common import FRONTEND_DIR
+from benchmarks.synthetic import synthetic_ohlcv
+
+logger = logging.getLogger(__name__)
+
+
+def _load_frontend():
+    spec = importlib.util.spec_from_file_location("trading_ia_frontend", FRONTEND_DIR / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def api_payload(n_points: int) -> List[dict]:
+    """Données au format JSON de /api/*/data/{symbol}"""
+    df = synthetic_ohlcv(n_points)
+    return [
+        {
+            "id": i,
+            "symbol": "SYN0000",
+            "timestamp": ts.isoformat(),
+            "open": row.Open,
+            "high": row.High,
+            "low": row.Low,
+            "close": row.Close,
+            "volume": row.Volume,
+            "created_at": ts.isoformat(),
+        }
+        for i, (ts, row) in enumerate(zip(df.index, df.itertuples(index=False)))
+    ]
+
+
+def run_frontend_benchmark(sizes: List[int], repeats: int = 5) -> Dict[str, object]:
+    """Mesure TradingIAApp.create_chart (DataFrame + figure Plotly + sérialisation)"""
+    try:
+        frontend = _load_frontend()
+    except ImportError as e:
+        return {"skipped": f"dependances frontend absentes: {e}"}
+
+    results: Dict[str, object] = {"repeats": repeats, "sizes": {}}
+    for size in sizes:
+        data = api_payload(size)
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fig = frontend.trading_app.create_chart(data, "SYN0000")
+            # ui.plotly envoie la figure au navigateur sous forme JSON
+            fig.to_json()
+            timings.append(time.perf_counter() - started)
+        results["sizes"][str(size)] = {
+            "median_ms": round(statistics.median(timings) * 1000.0, 3),
+            "best_ms": round(min(timings) * 1000.0, 3),
+        }
+        logger.info(f"Chart {size} points: {results['sizes'][str(size)]['median_ms']}ms")
+    return results
@@ -0,0 +1,84 @@
+"""Débit de l'inférence par lots (signaux/s), comparé à un appel par symbole"""
+import logging
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.common import ensure_backend_path
+
+logger = logging.getLogger(__name__)
+
+
+def _throughput(n_signals: int, elapsed: float) -> float:
+    return round(n_signals / elapsed, 1) if elapsed > 0 else None
+
+
+def run_inference_benchmark(window: int = 32, repeats: int = 3, seed: int = 42) -> Dict[str, object]:
+    """Matérialise les features de l'univers stocké puis évalue des modèles de taille croissante
+
+    Les signaux ne sont pas écrits en base : seule l'inférence (lecture des fenêtres
+    memmap + passe du modèle) est mesurée.
+    """
+    ensure_backend_path()
+    from database import engine
+    from services.features import FEATURE_COLUMNS, FeatureStore
+    from services.inference import InferenceService, LinearModel, ModelRegistry, MomentumModel
+    from services.workers import shutdown_process_pool, worker_count
+
+    rng = np.random.default_rng(seed)
+    n_features = len(FEATURE_COLUMNS)
+
+    with tempfile.TemporaryDirectory(prefix="inference-bench-") as root:
+        store = FeatureStore(Path(root) / "features")
+        built = store.build(engine, full=True)
+        keys = [(r["asset_class"], r["symbol"]) for r in built["results"] if r["rows"] >= window]
+        if not keys:
+            return {"skipped": "aucun symbole avec assez d'historique (lancer `run.py seed` avant)"}
+
+        heavy = LinearModel("linear_heavy", rng.normal(size=(window, n_features)), heavy=True)
+        heavy.path = str(Path(root) / "linear_heavy.pkl")
+        with open(heavy.path, "wb") as f:
+            pickle.dump(heavy, f)
+
+        registry = ModelRegistry(root)
+        service = InferenceService(store, registry)
+        candidates = [
+            MomentumModel(),
+            LinearModel("linear", rng.normal(size=(window, n_features))),
+            heavy,
+        ]
+
+        results: Dict[str, object] = {"symbols": len(keys), "window": window, "workers": worker_count(), "models": {}}
+        try:
+            for model in candidates:
+                # Premier passage non mesuré : ouverture des memmaps, démarrage du pool
+                _, X = service.latest_windows(keys, model.window)
+                service.predict(model, X)
+
+                batched, per_symbol = [], []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    rows, X = service.latest_windows(keys, model.window)
+                    service.predict(model, X)
+                    batched.append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    for key in keys:
+                        _, x = service.latest_windows([key], model.window)
+                        service.predict(model, x)
+                    per_symbol.append(time.perf_counter() - started)
+
+                results["models"][model.name] = {
+                    "heavy": model.heavy,
+                    "signals": len(rows),
+                    "batched_signals_per_sec": _throughput(len(rows), min(batched)),
+                    "per_symbol_signals_per_sec": _throughput(len(rows), min(per_symbol)),
+                }
+                logger.info(f"Inference {model.name}: {results['models'][model.name]}")
+        finally:
+            shutdown_process_pool()
+    return results
@@ -0,0 +1,86 @@
+"""Débit d'ingestion (lignes/s) de load_crypto_data et load_stock_data"""
+import asyncio
+import logging
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.common import INGEST_SYMBOL_PREFIX, ensure_backend_path
+from benchmarks.fake_providers import FakeProvider, FakeProviderConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _cleanup(db, models):
+    """Supprime les barres BENCH* et tout ce que leurs chargements ont écrit à côté"""
+    for model in (
+        models.CryptoData,
+        models.StockData,
+        models.SymbolVersion,
+        models.DataQualityReport,
+        models.QuarantinedBar,
+        models.Signal,
+        models.SymbolSnapshot,
+    ):
+        db.query(model).filter(model.symbol.like(f"{INGEST_SYMBOL_PREFIX}%")).delete(
+            synchronize_session=False
+        )
+    db.commit()
+
+
+def run_ingest_benchmark(
+    scales: List[int],
+    repeats: int = 3,
+    provider: FakeProviderConfig = None,
+) -> Dict[str, object]:
+    """Mesure le chargement complet (fetch simulé + transformation + écriture en base)
+
+    Chaque itération écrit sous un symbole BENCH* unique, supprimé en fin de run :
+    les données réelles ne sont jamais touchées.
+    """
+    ensure_backend_path()
+    import models
+    from database import SessionLocal
+    from services.data_loader import DataLoader
+
+    provider = provider or FakeProviderConfig()
+    end_date = datetime.utcnow().strftime("%Y-%m-%d")
+    results: Dict[str, object] = {"provider": provider.__dict__, "crypto": {}, "stocks": {}}
+
+    db = SessionLocal()
+    try:
+        _cleanup(db, models)
+        for scale in scales:
+            config = replace(provider, bars=scale)
+            start_date = (datetime.utcnow() - timedelta(days=scale)).strftime("%Y-%m-%d")
+
+            for asset in ("crypto", "stocks"):
+                fake = FakeProvider(f"fake-{asset}", config, asset_classes=(asset,))
+                loader = DataLoader(providers=[fake])
+                load = loader.load_crypto_data if asset == "crypto" else loader.load_stock_data
+                runs = []
+                for i in range(repeats):
+                    symbol = f"{INGEST_SYMBOL_PREFIX}{asset[0].upper()}{scale}-{i}"
+                    started = time.perf_counter()
+                    records = asyncio.run(load(symbol, start_date, end_date, db))
+                    elapsed = time.perf_counter() - started
+                    runs.append({"rows": len(records), "seconds": elapsed})
+
+                total_rows = sum(r["rows"] for r in runs)
+                total_s = sum(r["seconds"] for r in runs)
+                results[asset][str(scale)] = {
+                    "repeats": repeats,
+                    "rows_per_call": runs[0]["rows"] if runs else 0,
+                    "rows_per_sec": round(total_rows / total_s, 1) if total_s > 0 else None,
+                    "best_call_s": round(min(r["seconds"] for r in runs), 4),
+                    "mean_call_s": round(total_s / len(runs), 4),
+                    "provider": fake.stats(),
+                }
+                logger.info(f"Ingest {asset} scale={scale}: {results[asset][str(scale)]['rows_per_sec']} lignes/s")
+                _cleanup(db, models)
+    finally:
+        _cleanup(db, models)
+        db.close()
+
+    return results
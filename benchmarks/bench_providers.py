@@ -0,0 +1,62 @@
+"""Latence de récupération multi-fournisseurs avec et sans hedging"""
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from benchmarks.common import ensure_backend_path, latency_summary
+from benchmarks.fake_providers import FakeProvider, FakeProviderConfig
+
+logger = logging.getLogger(__name__)
+
+# (fournisseur principal, fournisseur de secours) pour chaque scénario
+SCENARIOS = {
+    "slow_primary": (
+        FakeProviderConfig(latency_ms=1500, jitter_ms=300),
+        FakeProviderConfig(latency_ms=150, jitter_ms=30),
+    ),
+    "flaky_primary": (
+        FakeProviderConfig(latency_ms=100, jitter_ms=20, failure_rate=0.5),
+        FakeProviderConfig(latency_ms=300, jitter_ms=50),
+    ),
+    "healthy": (
+        FakeProviderConfig(latency_ms=100, jitter_ms=20),
+        FakeProviderConfig(latency_ms=100, jitter_ms=20),
+    ),
+}
+
+
+async def _run_calls(loader_fetcher, n_calls: int):
+    latencies, winners = [], {}
+    for _ in range(n_calls):
+        started = time.perf_counter()
+        _, winner = await loader_fetcher.fetch("BENCH-USD", "2024-01-01", "2024-12-31", "crypto")
+        latencies.append(time.perf_counter() - started)
+        winners[str(winner)] = winners.get(str(winner), 0) + 1
+    return latencies, winners
+
+
+def run_providers_benchmark(n_calls: int = 30, hedge_delay: float = 0.3) -> Dict[str, object]:
+    """Compare le repli séquentiel (hedging désactivé) et le hedging par seuil de latence"""
+    ensure_backend_path()
+    from services.hedged_fetcher import HedgedFetcher
+
+    results: Dict[str, object] = {
+        "params": {"n_calls": n_calls, "hedge_delay_s": hedge_delay},
+        "scenarios": {},
+    }
+    for name, (primary, secondary) in SCENARIOS.items():
+        per_mode = {}
+        for mode, hedging in (("sequential", False), ("hedged", True)):
+            fetcher = HedgedFetcher(
+                [FakeProvider("primary", primary), FakeProvider("secondary", secondary)],
+                hedge_delay=hedge_delay,
+                hedging=hedging,
+            )
+            latencies, winners = asyncio.run(_run_calls(fetcher, n_calls))
+            summary = latency_summary(latencies)
+            summary.update({"winners": winners, "health": fetcher.health_report()})
+            per_mode[mode] = summary
+            logger.info(f"Providers {name}/{mode}: p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms")
+        results["scenarios"][name] = per_mode
+    return results
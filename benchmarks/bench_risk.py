@@ -0,0 +1,111 @@
+"""Simulation Monte Carlo du risque : 100 actifs x 100k trajectoires, un worker vs le pool"""
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import ensure_backend_path
+from benchmarks.synthetic import SEED_SYMBOL_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def _factor_returns(n_assets: int, n_days: int, seed: int) -> np.ndarray:
+    """Log-rendements journaliers corrélés (un facteur de marché + bruit spécifique)"""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.012, size=(n_days, 1))
+    betas = rng.uniform(0.5, 1.5, size=(1, n_assets))
+    return market * betas + rng.normal(0.0, 0.015, size=(n_days, n_assets))
+
+
+def _seeded_keys(db) -> List[tuple]:
+    from sqlalchemy import text
+
+    keys = []
+    for asset_class, table in (("crypto", "crypto_data"), ("stocks", "stock_data")):
+        rows = db.execute(
+            text(f"SELECT DISTINCT symbol FROM {table} WHERE symbol LIKE :prefix"),
+            {"prefix": f"{SEED_SYMBOL_PREFIX}%"},
+        )
+        keys += [(asset_class, row[0]) for row in rows]
+    return keys
+
+
+def _return_matrix_cache(lookback_days: int) -> Dict[str, object]:
+    """Construction de la matrice de rendements depuis la base, à froid puis depuis le cache"""
+    from database import SessionLocal
+    from services.risk import ReturnMatrixCache
+
+    cache = ReturnMatrixCache()
+    with SessionLocal() as db:
+        keys = _seeded_keys(db)
+        if not keys:
+            return {"skipped": "aucun symbole seede (lancer `run.py seed` avant)"}
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            try:
+                matrix, cached = cache.get(db, keys, lookback_days)
+            except ValueError as e:
+                return {"skipped": str(e)}
+            timings.append(time.perf_counter() - started)
+    return {
+        "symbols": len(keys),
+        "observations": len(matrix.returns),
+        "cold_ms": round(timings[0] * 1000, 3),
+        "cached_ms": round(timings[1] * 1000, 3),
+    }
+
+
+def run_risk_benchmark(
+    n_assets: int = 100,
+    n_paths: int = 100_000,
+    horizon_days: int = 10,
+    lookback_days: int = 3650,
+    seed: int = 42,
+) -> Dict[str, object]:
+    ensure_backend_path()
+    from services.risk import ReturnMatrix, _cholesky, historical_risk, monte_carlo_risk
+    from services.workers import shutdown_process_pool, worker_count
+
+    returns = _factor_returns(n_assets, 750, seed)
+    keys = tuple(("crypto", f"{SEED_SYMBOL_PREFIX}{i}") for i in range(n_assets))
+    matrix = ReturnMatrix(
+        keys=keys,
+        dates=np.arange(len(returns)),
+        returns=returns,
+        mean=returns.mean(axis=0),
+        cholesky=_cholesky(np.cov(returns, rowvar=False)),
+    )
+    weights = np.full(n_assets, 1.0 / n_assets)
+
+    started = time.perf_counter()
+    historical_risk(matrix, weights, horizon_days, (0.95, 0.99))
+    historical_s = time.perf_counter() - started
+
+    results: Dict[str, object] = {
+        "assets": n_assets,
+        "paths": n_paths,
+        "horizon_days": horizon_days,
+        "historical_ms": round(historical_s * 1000, 3),
+        "monte_carlo": {},
+    }
+    try:
+        # Démarrage du pool hors mesure
+        monte_carlo_risk(matrix, weights, horizon_days, 1_000, (0.99,), seed)
+        for workers in sorted({1, worker_count()}):
+            started = time.perf_counter()
+            report = monte_carlo_risk(matrix, weights, horizon_days, n_paths, (0.95, 0.99), seed, workers)
+            elapsed = time.perf_counter() - started
+            results["monte_carlo"][str(workers)] = {
+                "seconds": round(elapsed, 4),
+                "paths_per_sec": round(n_paths / elapsed, 1) if elapsed > 0 else None,
+                "var_99": report["levels"]["0.99"]["var"],
+            }
+            logger.info(f"Risque {n_assets} actifs x {n_paths} trajectoires, {workers} worker(s): {elapsed:.2f}s")
+    finally:
+        shutdown_process_pool()
+
+    results["return_matrix"] = _return_matrix_cache(lookback_days)
+    return results
@@ -0,0 +1,123 @@
+"""Démarrage à froid du backend : import, /health, /ready et première requête par route"""
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.common import BACKEND_DIR
+
+logger = logging.getLogger(__name__)
+
+FIRST_REQUEST_ROUTES: List[Tuple[str, str]] = [
+    ("crypto_symbols", "/api/crypto/symbols"),
+    ("stats", "/api/stats"),
+    ("screener", "/api/screener?query=close>0"),
+]
+
+# Mesure de l'import dans un interpréteur neuf ; pandas ne doit pas y être chargé
+IMPORT_PROBE = (
+    "import sys, time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started, 'pandas' in sys.modules, 'numpy' in sys.modules)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, started: float, timeout: float, process: subprocess.Popen) -> Optional[float]:
+    """Secondes écoulées depuis `started` jusqu'à la première réponse 200 de `url`"""
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Le backend s'est arrete (code {process.returncode})")
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except requests.RequestException:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def _timed_get(url: str) -> Tuple[float, int]:
+    started = time.perf_counter()
+    response = requests.get(url, timeout=30)
+    return time.perf_counter() - started, response.status_code
+
+
+def measure_import(env: dict) -> Dict[str, object]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return {
+        "import_ms": round(float(output[0]) * 1000, 1),
+        "pandas_loaded": output[1] == "True",
+        "numpy_loaded": output[2] == "True",
+    }
+
+
+def measure_cold_start(env: dict, timeout: float) -> Dict[str, object]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        health_s = _wait_for(f"{base_url}/health", started, timeout, process)
+        ready_s = _wait_for(f"{base_url}/ready", started, timeout, process)
+        routes = {}
+        for name, path in FIRST_REQUEST_ROUTES:
+            first, status = _timed_get(f"{base_url}{path}")
+            second, _ = _timed_get(f"{base_url}{path}")
+            if status >= 400:
+                logger.warning(f"{path}: HTTP {status}, la premiere requete ne mesure pas le chemin nominal")
+            routes[name] = {
+                "status": status,
+                "first_ms": round(first * 1000, 2),
+                "second_ms": round(second * 1000, 2),
+            }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {
+        "health_ms": round(health_s * 1000, 1) if health_s is not None else None,
+        "ready_ms": round(ready_s * 1000, 1) if ready_s is not None else None,
+        "routes": routes,
+    }
+
+
+def run_startup_benchmark(repeats: int = 3, timeout: float = 60.0) -> Dict[str, object]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    runs = []
+    for i in range(repeats):
+        run = {**measure_import(env), **measure_cold_start(env, timeout)}
+        logger.info(f"Demarrage {i + 1}/{repeats}: {run}")
+        runs.append(run)
+
+    def best(field: str) -> Optional[float]:
+        values = [r[field] for r in runs if r[field] is not None]
+        return min(values) if values else None
+
+    return {
+        "repeats": repeats,
+        "import_ms": best("import_ms"),
+        "health_ms": best("health_ms"),
+        "ready_ms": best("ready_ms"),
+        "pandas_loaded_at_import": any(r["pandas_loaded"] for r in runs),
+        "runs": runs,
+    }
@@ -0,0 +1,73 @@
+"""Surcoût de la validation qualité comparé à la transformation du chargement"""
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import ensure_backend_path
+from benchmarks.synthetic import synthetic_ohlcv
+
+logger = logging.getLogger(__name__)
+
+
+def _inject_faults(df, rate: float, seed: int):
+    """Ajoute des barres incohérentes, des spikes, des trous et des doublons (≈ rate de chaque)"""
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    count = max(1, int(n * rate))
+    df = df.copy()
+    high, close = df.columns.get_loc("High"), df.columns.get_loc("Close")
+    rows = rng.choice(np.arange(1, n - 1), size=3 * count, replace=False)
+    bad_ohlc, spikes, gaps = np.split(rows, 3)
+    df.iloc[bad_ohlc, high] = df.iloc[bad_ohlc, close] * 0.95
+    df.iloc[spikes, close] = df.iloc[spikes, close] * 4.0
+    df = df.drop(df.index[gaps])
+    return df.iloc[np.r_[np.arange(len(df)), rng.integers(0, len(df), count)]]
+
+
+def _transform(df, symbol: str, model) -> list:
+    """Même transformation que DataLoader.load_crypto_data (une instance ORM par barre)"""
+    return [
+        model(
+            symbol=symbol,
+            timestamp=index.to_pydatetime(),
+            open=float(row["Open"]),
+            high=float(row["High"]),
+            low=float(row["Low"]),
+            close=float(row["Close"]),
+            volume=float(row["Volume"]),
+        )
+        for index, row in df.iterrows()
+    ]
+
+
+def run_validation_benchmark(scales: List[int], repeats: int = 3, fault_rate: float = 0.001, seed: int = 42) -> Dict[str, object]:
+    ensure_backend_path()
+    import models
+    from services.validation import DataValidator
+
+    validator = DataValidator()
+    results: Dict[str, object] = {"fault_rate": fault_rate, "scales": {}}
+    for n_rows in scales:
+        df = _inject_faults(synthetic_ohlcv(n_rows, seed=seed), fault_rate, seed)
+        validate, transform = [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = validator.validate(df, "crypto")
+            validate.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            _transform(result.clean, "BENCH", models.CryptoData)
+            transform.append(time.perf_counter() - started)
+
+        best_validate, best_transform = min(validate), min(transform)
+        results["scales"][str(n_rows)] = {
+            "rows": len(df),
+            "validate_ms": round(best_validate * 1000, 3),
+            "transform_ms": round(best_transform * 1000, 3),
+            "validate_rows_per_sec": round(len(df) / best_validate, 1) if best_validate > 0 else None,
+            "overhead_pct": round(100 * best_validate / best_transform, 2) if best_transform > 0 else None,
+            "checks": {name: check["count"] for name, check in result.report["checks"].items()},
+        }
+        logger.info(f"Validation {n_rows} lignes: {results['scales'][str(n_rows)]}")
+    return results
@@ -0,0 +1,83 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+FRONTEND_DIR = ROOT_DIR / "frontend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Préfixes réservés aux données de benchmark (jamais utilisés par de vrais symboles)
+SEED_SYMBOL_PREFIX = "SYN"
+INGEST_SYMBOL_PREFIX = "BENCH"
+
+
+def ensure_backend_path():
+    """Rend les modules du backend importables (database, models, services...)"""
+    backend = str(BACKEND_DIR)
+    if backend not in sys.path:
+        sys.path.insert(0, backend)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (sans dépendance numpy)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    """Résumé p50/p90/p99 en millisecondes"""
+    ms = [v * 1000.0 for v in latencies_s]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_metadata() -> Dict[str, object]:
+    """Contexte d'exécution enregistré avec chaque résultat"""
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_commit": _git("rev-parse", "--short", "HEAD"),
+        "git_describe": _git("describe", "--always", "--dirty"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(results: Dict[str, object], output: Optional[str] = None) -> Path:
+    """Écrit les résultats en JSON (par défaut dans benchmarks/results/)"""
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        meta = results.get("meta", {})
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = RESULTS_DIR / f"{stamp}_{meta.get('git_commit') or 'nogit'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+    return path
@@ -0,0 +1,88 @@
+"""Compare deux fichiers de résultats et signale les régressions
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json --threshold 10
+
+Le code de sortie vaut 1 si une métrique régresse de plus du seuil (en %).
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+# Suffixes de métriques : True = plus grand est meilleur
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms", "_s", "seconds", "overhead_pct", "errors")
+
+# Sous-dictionnaires de paramètres recopiés dans les résultats : jamais comparés
+PARAMS_KEY = "params"
+
+
+def flatten(data, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix] = float(data)
+    return flat
+
+
+def direction(key: str) -> Optional[bool]:
+    """True si la métrique doit augmenter, False si elle doit baisser, None sinon"""
+    parts = key.split(".")
+    if PARAMS_KEY in parts[:-1]:
+        return None
+    leaf = parts[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return True
+    if leaf.endswith(LOWER_IS_BETTER):
+        return False
+    return None
+
+
+def compare(old: dict, new: dict, threshold: float):
+    old_flat = flatten(old.get("suites", {}))
+    new_flat = flatten(new.get("suites", {}))
+    regressions = []
+    rows = []
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        better_up = direction(key)
+        if better_up is None or old_flat[key] == new_flat[key] == 0:
+            continue
+        if old_flat[key] == 0:
+            # Apparition d'erreurs, par exemple : variation relative infinie
+            change = float("inf") if new_flat[key] > 0 else float("-inf")
+        else:
+            change = (new_flat[key] - old_flat[key]) / abs(old_flat[key]) * 100.0
+        worse = -change if better_up else change
+        rows.append((key, old_flat[key], new_flat[key], change))
+        if worse > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparaison de benchmarks")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression toleree en %%")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows, regressions = compare(old, new, args.threshold)
+    print(f"{old['meta'].get('git_describe')} -> {new['meta'].get('git_describe')}")
+    for key, before, after, change in rows:
+        flag = "  REGRESSION" if key in regressions else ""
+        print(f"{key:70s} {before:14.3f} {after:14.3f} {change:+8.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) au-dela de {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Fournisseur de données local remplaçant Yahoo Finance, CoinGecko et ccxt
+
+Il implémente `services.providers.MarketDataProvider` avec une latence et des taux
+d'échec configurables, sans aucun appel réseau.
+"""
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Tuple
+
+import pandas as pd
+
+from benchmarks.common import ensure_backend_path
+from benchmarks.synthetic import synthetic_ohlcv
+
+ensure_backend_path()
+from services.providers import MarketDataProvider  # noqa: E402
+
+
+@dataclass
+class FakeProviderConfig:
+    """Comportement simulé d'un fournisseur"""
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    failure_rate: float = 0.0     # probabilité de lever une exception
+    empty_rate: float = 0.0       # probabilité de retourner un résultat vide
+    bars: int = 365               # nombre de barres retournées par appel
+    seed: int = 42
+
+
+class FakeProvider(MarketDataProvider):
+    """Fournisseur simulé ; l'appel bloquant tourne dans un thread comme les vraies librairies"""
+
+    def __init__(
+        self,
+        name: str = "fake",
+        config: FakeProviderConfig = None,
+        asset_classes: Tuple[str, ...] = ("crypto", "stocks"),
+    ):
+        self.name = name
+        self.config = config or FakeProviderConfig()
+        self.asset_classes = asset_classes
+        self.rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.empties = 0
+
+    def _draw(self) -> Tuple[float, float, float]:
+        with self._lock:
+            self.calls += 1
+            return (
+                max(0.0, self.rng.gauss(self.config.latency_ms, self.config.jitter_ms)),
+                self.rng.random(),
+                self.rng.random(),
+            )
+
+    def _fetch_blocking(self, end_date: str) -> pd.DataFrame:
+        delay_ms, fail_draw, empty_draw = self._draw()
+        time.sleep(delay_ms / 1000.0)
+        if fail_draw < self.config.failure_rate:
+            with self._lock:
+                self.failures += 1
+            raise RuntimeError(f"{self.name}: echec simule")
+        if empty_draw < self.config.empty_rate:
+            with self._lock:
+                self.empties += 1
+            return pd.DataFrame()
+        end = pd.Timestamp(end_date).floor("D")
+        start = end - pd.Timedelta(days=self.config.bars)
+        return synthetic_ohlcv(self.config.bars, start=start.to_pydatetime(), seed=self.config.seed)
+
+    async def fetch(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        return await asyncio.to_thread(self._fetch_blocking, end_date)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "failures": self.failures, "empties": self.empties}
@@ -0,0 +1,168 @@
+"""Point d'entrée de la suite de benchmarks
+
+Exemples (depuis la racine du dépôt) :
+    python -m benchmarks.run seed --rows 1e6
+    python -m benchmarks.run ingest --scales 1e3 1e4
+    python -m benchmarks.run providers --hedge-delay 0.3
+    python -m benchmarks.run validation --scales 1e3 1e4 1e5
+    python -m benchmarks.run features
+    python -m benchmarks.run inference
+    python -m benchmarks.run risk --assets 100 --paths 1e5
+    python -m benchmarks.run api --backend-url http://localhost:8000 --concurrency 1 8 32
+    python -m benchmarks.run frontend
+    python -m benchmarks.run startup --repeats 5
+    python -m benchmarks.run all --rows 1e5
+"""
+import argparse
+import logging
+import os
+
+from benchmarks.common import run_metadata, write_results
+from benchmarks.fake_providers import FakeProviderConfig
+from benchmarks.synthetic import parse_scale
+
+logger = logging.getLogger("benchmarks")
+
+
+def _provider_config(args) -> FakeProviderConfig:
+    return FakeProviderConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        empty_rate=args.empty_rate,
+        seed=args.seed,
+    )
+
+
+def _run_seed(args) -> dict:
+    from benchmarks.synthetic import seed_database
+    return seed_database(
+        parse_scale(args.rows), n_symbols=args.symbols, asset_class=args.asset_class, seed=args.seed
+    )
+
+
+def _run_ingest(args) -> dict:
+    from benchmarks.bench_ingest import run_ingest_benchmark
+    return run_ingest_benchmark(
+        [parse_scale(s) for s in args.scales], repeats=args.repeats, provider=_provider_config(args)
+    )
+
+
+def _run_providers(args) -> dict:
+    from benchmarks.bench_providers import run_providers_benchmark
+    return run_providers_benchmark(n_calls=args.provider_calls, hedge_delay=args.hedge_delay)
+
+
+def _run_validation(args) -> dict:
+    from benchmarks.bench_validation import run_validation_benchmark
+    return run_validation_benchmark(
+        [parse_scale(s) for s in args.scales], repeats=args.repeats, fault_rate=args.fault_rate, seed=args.seed
+    )
+
+
+def _run_features(args) -> dict:
+    from benchmarks.bench_features import run_features_benchmark
+    return run_features_benchmark()
+
+
+def _run_inference(args) -> dict:
+    from benchmarks.bench_inference import run_inference_benchmark
+    return run_inference_benchmark(window=args.window, repeats=args.repeats, seed=args.seed)
+
+
+def _run_risk(args) -> dict:
+    from benchmarks.bench_risk import run_risk_benchmark
+    return run_risk_benchmark(
+        n_assets=args.assets, n_paths=parse_scale(args.paths), horizon_days=args.horizon, seed=args.seed
+    )
+
+
+def _run_api(args) -> dict:
+    from benchmarks.bench_api import run_api_benchmark
+    return run_api_benchmark(
+        args.backend_url, args.concurrency, n_requests=args.requests, limit=args.limit
+    )
+
+
+def _run_startup(args) -> dict:
+    from benchmarks.bench_startup import run_startup_benchmark
+    return run_startup_benchmark(repeats=args.repeats)
+
+
+def _run_frontend(args) -> dict:
+    from benchmarks.bench_frontend import run_frontend_benchmark
+    return run_frontend_benchmark([parse_scale(s) for s in args.chart_sizes], repeats=args.repeats)
+
+
+SUITES = {
+    "seed": _run_seed,
+    "ingest": _run_ingest,
+    "providers": _run_providers,
+    "validation": _run_validation,
+    "features": _run_features,
+    "inference": _run_inference,
+    "risk": _run_risk,
+    "api": _run_api,
+    "startup": _run_startup,
+    "frontend": _run_frontend,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks Trading IA")
+    parser.add_argument("suite", choices=[*SUITES, "all"])
+    parser.add_argument("--output", help="Fichier JSON de sortie (defaut: benchmarks/results/)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=3)
+
+    seed = parser.add_argument_group("seed")
+    seed.add_argument("--rows", default="1e4", help="Lignes synthetiques par table (1e4 a 1e8)")
+    seed.add_argument("--symbols", type=int, default=10)
+    seed.add_argument("--asset-class", choices=["crypto", "stocks", "both"], default="both")
+
+    ingest = parser.add_argument_group("ingest / fournisseur simule")
+    ingest.add_argument("--scales", nargs="+", default=["1e2", "1e3", "1e4"])
+    ingest.add_argument("--latency-ms", type=float, default=50.0)
+    ingest.add_argument("--jitter-ms", type=float, default=10.0)
+    ingest.add_argument("--failure-rate", type=float, default=0.0)
+    ingest.add_argument("--empty-rate", type=float, default=0.0)
+    ingest.add_argument("--provider-calls", type=int, default=30)
+    ingest.add_argument("--hedge-delay", type=float, default=0.3)
+    ingest.add_argument("--fault-rate", type=float, default=0.001, help="Part de barres defectueuses (validation)")
+
+    inference = parser.add_argument_group("inference")
+    inference.add_argument("--window", type=int, default=32, help="Fenetre des modeles lineaires")
+
+    risk = parser.add_argument_group("risk")
+    risk.add_argument("--assets", type=int, default=100)
+    risk.add_argument("--paths", default="1e5")
+    risk.add_argument("--horizon", type=int, default=10, help="Horizon en jours")
+
+    api = parser.add_argument_group("api")
+    api.add_argument("--backend-url", default=os.getenv("BACKEND_URL", "http://localhost:8000"))
+    api.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    api.add_argument("--requests", type=int, default=200)
+    api.add_argument("--limit", type=int, default=1000)
+
+    frontend = parser.add_argument_group("frontend")
+    frontend.add_argument("--chart-sizes", nargs="+", default=["1e2", "1e3", "1e4"])
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    args = build_parser().parse_args(argv)
+
+    suites = list(SUITES) if args.suite == "all" else [args.suite]
+    results = {"meta": run_metadata(), "args": vars(args), "suites": {}}
+    for name in suites:
+        logger.info(f"=== {name}")
+        results["suites"][name] = SUITES[name](args)
+
+    path = write_results(results, args.output)
+    logger.info(f"Resultats ecrits dans {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
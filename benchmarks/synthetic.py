@@ -0,0 +1,166 @@
+import io
+import logging
+import time
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import SEED_SYMBOL_PREFIX, ensure_backend_path
+
+logger = logging.getLogger(__name__)
+
+TABLES = {"crypto": "crypto_data", "stocks": "stock_data"}
+
+# Taille des lots envoyés via COPY (borne la mémoire pour 1e8 lignes)
+COPY_CHUNK_ROWS = 1_000_000
+
+
+def synthetic_ohlcv(
+    n_rows: int,
+    start: datetime = datetime(2000, 1, 1),
+    freq: str = "D",
+    seed: int = 42,
+    start_price: float = 100.0,
+) -> pd.DataFrame:
+    """Génère des barres OHLCV par marche aléatoire géométrique (déterministe via seed)
+
+    Le DataFrame a le même format que celui retourné par yfinance :
+    index temporel et colonnes Open/High/Low/Close/Volume.
+    """
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0002, 0.02, n_rows)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.01, n_rows))
+    high = np.maximum(open_, close) * (1.0 + spread)
+    low = np.minimum(open_, close) * (1.0 - spread)
+    volume = rng.lognormal(10.0, 1.0, n_rows)
+
+    index = pd.date_range(start=start, periods=n_rows, freq=freq)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def _copy_chunk(cursor, table: str, symbol: str, df: pd.DataFrame):
+    buffer = io.StringIO()
+    frame = pd.DataFrame({
+        "symbol": symbol,
+        "timestamp": df.index,
+        "open": df["Open"].to_numpy(),
+        "high": df["High"].to_numpy(),
+        "low": df["Low"].to_numpy(),
+        "close": df["Close"].to_numpy(),
+        "volume": df["Volume"].to_numpy(),
+    })
+    frame.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S")
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} (symbol, timestamp, open, high, low, close, volume) "
+        f"FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def reset_seed_data(engine, asset_class: str = "both"):
+    """Supprime les données synthétiques (symboles préfixés SYN) des tables"""
+    from sqlalchemy import text
+
+    targets = TABLES.values() if asset_class == "both" else [TABLES[asset_class]]
+    with engine.begin() as conn:
+        for table in targets:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE symbol LIKE :prefix"),
+                {"prefix": f"{SEED_SYMBOL_PREFIX}%"},
+            )
+
+
+def seed_database(
+    total_rows: int,
+    n_symbols: int = 10,
+    asset_class: str = "both",
+    seed: int = 42,
+    reset: bool = True,
+    engine=None,
+) -> Dict[str, object]:
+    """Remplit Postgres avec des barres synthétiques via COPY
+
+    Les lignes sont réparties sur `n_symbols` symboles SYN0000..SYNnnnn par table,
+    en barres minute pour que les grands volumes restent dans des plages de dates réalistes.
+    """
+    ensure_backend_path()
+    if engine is None:
+        from database import engine
+
+    if reset:
+        reset_seed_data(engine, asset_class)
+
+    targets = list(TABLES.items()) if asset_class == "both" else [(asset_class, TABLES[asset_class])]
+    rows_per_symbol = max(1, total_rows // n_symbols)
+    report: Dict[str, object] = {
+        "total_rows": total_rows,
+        "n_symbols": n_symbols,
+        "rows_per_symbol": rows_per_symbol,
+        "tables": {},
+    }
+
+    for asset, table in targets:
+        started = time.perf_counter()
+        inserted = 0
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for i in range(n_symbols):
+                symbol = f"{SEED_SYMBOL_PREFIX}{i:04d}"
+                offset = 0
+                last_close = 100.0
+                while offset < rows_per_symbol:
+                    size = min(COPY_CHUNK_ROWS, rows_per_symbol - offset)
+                    chunk_start = pd.Timestamp("2000-01-01") + pd.Timedelta(minutes=offset)
+                    df = synthetic_ohlcv(
+                        size,
+                        start=chunk_start.to_pydatetime(),
+                        freq="min",
+                        seed=seed + i * 1_000_003 + offset,
+                        start_price=last_close,
+                    )
+                    last_close = float(df["Close"].iloc[-1])
+                    _copy_chunk(cursor, table, symbol, df)
+                    offset += size
+                    inserted += size
+                # Même effet qu'un chargement du DataLoader : invalide ETag et cache de réponses
+                cursor.execute(
+                    "INSERT INTO symbol_versions (asset_class, symbol, version, updated_at) "
+                    "VALUES (%s, %s, 1, now() at time zone 'utc') "
+                    "ON CONFLICT (asset_class, symbol) DO UPDATE "
+                    "SET version = symbol_versions.version + 1, updated_at = EXCLUDED.updated_at",
+                    (asset, symbol),
+                )
+                raw.commit()
+            cursor.execute(f"ANALYZE {table}")
+            raw.commit()
+        finally:
+            raw.close()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Seed {table}: {inserted} lignes en {elapsed:.1f}s")
+        report["tables"][asset] = {
+            "rows": inserted,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(inserted / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    return report
+
+
+def seed_symbol(index: int = 0) -> str:
+    """Nom du symbole synthétique utilisé par les benchmarks d'API"""
+    return f"{SEED_SYMBOL_PREFIX}{index:04d}"
+
+
+def parse_scale(value: str) -> int:
+    """Accepte '1e6', '1000000' ou '1_000_000'"""
+    return int(float(value.replace("_", "")))
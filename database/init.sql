@@ -41,6 +41,85 @@ CREATE INDEX IF NOT EXISTS idx_stock_symbol ON stock_data(symbol);
 CREATE INDEX IF NOT EXISTS idx_stock_timestamp ON stock_data(timestamp);
 CREATE INDEX IF NOT EXISTS idx_stock_symbol_timestamp ON stock_data(symbol, timestamp);
 
+-- Version des données par symbole (ETag / cache de réponses)
+CREATE TABLE IF NOT EXISTS symbol_versions (
+    asset_class VARCHAR(20) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (asset_class, symbol)
+);
+
+-- Derniers signaux des modèles (un par modèle et par symbole)
+CREATE TABLE IF NOT EXISTS signals (
+    model VARCHAR(100) NOT NULL,
+    asset_class VARCHAR(20) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model, asset_class, symbol)
+);
+
+-- Dernier état de chaque symbole pour le screener (une ligne par symbole)
+CREATE TABLE IF NOT EXISTS symbol_snapshots (
+    asset_class VARCHAR(20) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION NOT NULL,
+    sma_20 DOUBLE PRECISION,
+    sma_50 DOUBLE PRECISION,
+    sma_200 DOUBLE PRECISION,
+    rsi_14 DOUBLE PRECISION,
+    ret_1d DOUBLE PRECISION,
+    ret_5d DOUBLE PRECISION,
+    ret_20d DOUBLE PRECISION,
+    volatility_20 DOUBLE PRECISION,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (asset_class, symbol)
+);
+
+-- Barres écartées par la validation à l'ingestion
+CREATE TABLE IF NOT EXISTS quarantined_bars (
+    id SERIAL PRIMARY KEY,
+    asset_class VARCHAR(20) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    reason VARCHAR(200) NOT NULL,
+    provider VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_quarantined_symbol ON quarantined_bars(asset_class, symbol, timestamp);
+
+-- Rapports de qualité de chaque chargement
+CREATE TABLE IF NOT EXISTS data_quality_reports (
+    id SERIAL PRIMARY KEY,
+    asset_class VARCHAR(20) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    provider VARCHAR(50),
+    rows_in INTEGER NOT NULL,
+    rows_out INTEGER NOT NULL,
+    quarantined INTEGER NOT NULL,
+    repaired INTEGER NOT NULL,
+    flagged INTEGER NOT NULL,
+    checks JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_quality_symbol ON data_quality_reports(asset_class, symbol, created_at);
+
 -- Commentaires sur les tables
 COMMENT ON TABLE crypto_data IS 'Données historiques des crypto-monnaies';
 COMMENT ON TABLE stock_data IS 'Données historiques des actions françaises';
+COMMENT ON TABLE symbol_versions IS 'Version des données de chaque symbole, incrémentée à chaque chargement';
+COMMENT ON TABLE signals IS 'Dernier signal de chaque modèle par symbole, recalculé après chaque chargement';
+COMMENT ON TABLE symbol_snapshots IS 'Indicateurs à la dernière barre de chaque symbole, mis à jour après chaque chargement';
+COMMENT ON TABLE quarantined_bars IS 'Barres rejetées par la validation à l''ingestion, avec le motif';
+COMMENT ON TABLE data_quality_reports IS 'Rapport de validation de chaque chargement (contrôles, actions, volumes)';
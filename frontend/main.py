@@ -1,6 +1,8 @@
-from nicegui import ui, app
+from nicegui import ui, app, run
 import requests
+import logging
 import os
+import time
 from datetime import datetime, timedelta
 import pandas as pd
 import plotly.graph_objects as go
@@ -8,6 +10,70 @@ from typing import Optional
 
 # Configuration
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+SYMBOLS_CACHE_TTL = float(os.getenv("SYMBOLS_CACHE_TTL", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolCache:
+    """Listes de symboles préchargées au démarrage : l'affichage d'une page n'attend pas le backend"""
+    
+    def __init__(self, ttl: float = SYMBOLS_CACHE_TTL):
+        self.ttl = ttl
+        self.symbols = {}
+        self.fetched_at = {}
+    
+    def cached(self, asset_class: str) -> list:
+        """Dernière liste connue (vide si jamais chargée)"""
+        return self.symbols.get(asset_class, [])
+    
+    def is_fresh(self, asset_class: str) -> bool:
+        return time.monotonic() - self.fetched_at.get(asset_class, float('-inf')) < self.ttl
+    
+    def fetch(self, asset_class: str) -> list:
+        """Appel bloquant au backend (à exécuter hors de la boucle d'événements)"""
+        response = requests.get(f'{BACKEND_URL}/api/{asset_class}/symbols', timeout=5)
+        response.raise_for_status()
+        self.symbols[asset_class] = response.json()
+        self.fetched_at[asset_class] = time.monotonic()
+        return self.symbols[asset_class]
+    
+    async def get(self, asset_class: str) -> list:
+        if not self.is_fresh(asset_class):
+            await run.io_bound(self.fetch, asset_class)
+        return self.cached(asset_class)
+    
+    async def warm(self):
+        """Préchargement au démarrage ; un backend pas encore prêt n'empêche pas le démarrage"""
+        for asset_class in ('crypto', 'stocks'):
+            try:
+                await run.io_bound(self.fetch, asset_class)
+            except Exception as e:
+                logger.warning(f'Prechargement des symboles {asset_class} impossible: {e}')
+
+
+symbol_cache = SymbolCache()
+app.on_startup(symbol_cache.warm)
+
+
+def bind_symbols(symbol_select, asset_class: str):
+    """Remplit la liste depuis le cache, puis la complète après l'affichage si besoin"""
+    def apply(symbols: list):
+        symbol_select.options = symbols
+        if symbols and symbol_select.value not in symbols:
+            symbol_select.value = symbols[0]
+        symbol_select.update()
+    
+    apply(symbol_cache.cached(asset_class))
+    
+    async def refresh():
+        try:
+            apply(await symbol_cache.get(asset_class))
+        except Exception as e:
+            ui.notify(f'Impossible de charger les symboles: {e}', type='warning')
+    
+    if not symbol_cache.is_fresh(asset_class):
+        ui.timer(0, refresh, once=True)
 
 
 class TradingIAApp:
@@ -58,6 +124,7 @@ def index():
     with ui.tabs().classes('w-full') as tabs:
         crypto_tab = ui.tab('Crypto-monnaies', icon='currency_bitcoin')
         stocks_tab = ui.tab('Bourse Française', icon='trending_up')
+        screener_tab = ui.tab('Screener', icon='filter_alt')
         stats_tab = ui.tab('Statistiques', icon='analytics')
     
     with ui.tab_panels(tabs, value=crypto_tab).classes('w-full'):
@@ -69,6 +136,10 @@ def index():
         with ui.tab_panel(stocks_tab):
             create_stocks_panel()
         
+        # Panel Screener
+        with ui.tab_panel(screener_tab):
+            create_screener_panel()
+        
         # Panel Statistiques
         with ui.tab_panel(stats_tab):
             create_stats_panel()
@@ -108,16 +179,8 @@ def create_crypto_panel():
         # Zone de graphique
         chart_container = ui.column().classes('w-full mt-4')
     
-    # Chargement initial des symboles disponibles
-    try:
-        response = requests.get(f'{BACKEND_URL}/api/crypto/symbols', timeout=5)
-        if response.status_code == 200:
-            symbols = response.json()
-            symbol_select.options = symbols
-            if symbols:
-                symbol_select.value = symbols[0]
-    except Exception as e:
-        ui.notify(f'Impossible de charger les symboles: {e}', type='warning')
+    # Symboles disponibles (cache préchargé au démarrage)
+    bind_symbols(symbol_select, 'crypto')
     
     # Chargement des données
     async def load_data():
@@ -220,16 +283,8 @@ def create_stocks_panel():
         # Zone de graphique
         chart_container = ui.column().classes('w-full mt-4')
     
-    # Chargement initial des symboles disponibles
-    try:
-        response = requests.get(f'{BACKEND_URL}/api/stocks/symbols', timeout=5)
-        if response.status_code == 200:
-            symbols = response.json()
-            symbol_select.options = symbols
-            if symbols:
-                symbol_select.value = symbols[0]
-    except Exception as e:
-        ui.notify(f'Impossible de charger les symboles: {e}', type='warning')
+    # Symboles disponibles (cache préchargé au démarrage)
+    bind_symbols(symbol_select, 'stocks')
     
     # Chargement des données
     async def load_data():
@@ -298,6 +353,99 @@ def create_stocks_panel():
     show_btn.on_click(show_data)
 
 
+SCREENER_COLUMNS = [
+    ('symbol', 'Symbole'),
+    ('asset_class', 'Classe'),
+    ('close', 'Clôture'),
+    ('rsi_14', 'RSI(14)'),
+    ('sma_50', 'SMA(50)'),
+    ('sma_200', 'SMA(200)'),
+    ('ret_5d', 'Rend. 5j'),
+    ('ret_20d', 'Rend. 20j'),
+    ('volatility_20', 'Volatilité 20j'),
+]
+
+
+def format_screener_value(key: str, value):
+    """Formate une cellule du screener (rendements en %)"""
+    if value is None:
+        return '-'
+    if key.startswith('ret_') or key == 'volatility_20':
+        return f'{value * 100:.2f} %'
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    return value
+
+
+def create_screener_panel():
+    """Panel pour filtrer tous les symboles sur leurs indicateurs"""
+    ui.label('Screener').classes('text-xl font-bold mb-4')
+    
+    with ui.card().classes('w-full p-4'):
+        query_input = ui.input(
+            label='Requête',
+            value='RSI(14) < 30 and close > SMA(200)',
+            placeholder='ex: RETURN(20) in top decile'
+        ).classes('w-full')
+        
+        with ui.row().classes('w-full gap-4'):
+            asset_select = ui.select(
+                label='Classe d\'actif',
+                options={'': 'Toutes', 'crypto': 'Crypto-monnaies', 'stocks': 'Actions françaises'},
+                value=''
+            ).classes('w-48')
+            
+            sort_input = ui.input(label='Trier par', value='RETURN(20)').classes('w-48')
+            descending = ui.checkbox('Décroissant', value=True)
+        
+        ui.label(
+            'Champs : close, volume, SMA(20|50|200), RSI(14), RETURN(1|5|20), VOLATILITY(20) — '
+            'opérateurs : and, or, not, < <= > >= =, + - * /, in top|bottom decile|quintile|quartile|N%'
+        ).classes('text-xs text-gray-500')
+        
+        run_btn = ui.button('Filtrer', icon='search').classes('mt-2')
+        status_label = ui.label('').classes('mt-2')
+    
+    results_container = ui.column().classes('w-full mt-4')
+    
+    async def run_screen():
+        params = {
+            'query': query_input.value,
+            'sort': sort_input.value or None,
+            'descending': descending.value,
+            'limit': 500,
+        }
+        if asset_select.value:
+            params['asset_class'] = asset_select.value
+        
+        try:
+            response = await run.io_bound(requests.get, f'{BACKEND_URL}/api/screener', params=params, timeout=10)
+            if response.status_code != 200:
+                ui.notify(response.json().get('detail', 'Erreur du screener'), type='negative')
+                return
+            
+            result = response.json()
+            shown = f" ({result['returned']} affichés)" if result['returned'] < result['count'] else ''
+            status_label.text = f"{result['count']} symbole(s){shown} en {result['elapsed_ms']} ms"
+            rows = [
+                {key: format_screener_value(key, row.get(key)) for key, _ in SCREENER_COLUMNS}
+                for row in result['results']
+            ]
+            results_container.clear()
+            with results_container:
+                ui.table(
+                    columns=[{'name': key, 'label': label, 'field': key, 'align': 'left'} for key, label in SCREENER_COLUMNS],
+                    rows=rows,
+                    row_key='symbol',
+                    pagination=25
+                ).classes('w-full')
+        except Exception as e:
+            ui.notify(f'Erreur: {e}', type='negative')
+    
+    run_btn.on_click(run_screen)
+    query_input.on('keydown.enter', run_screen)
+
+
 def create_stats_panel():
     """Panel pour les statistiques"""
     ui.label('Statistiques de la base de données').classes('text-xl font-bold mb-4')
@@ -306,7 +454,7 @@ def create_stats_panel():
     
     async def load_stats():
         try:
-            response = requests.get(f'{BACKEND_URL}/api/stats', timeout=5)
+            response = await run.io_bound(requests.get, f'{BACKEND_URL}/api/stats', timeout=5)
             if response.status_code == 200:
                 stats = response.json()
                 
@@ -325,30 +473,12 @@ def create_stats_panel():
                             ui.label(f"Symboles: {stats['stocks']['symbols_count']}").classes('text-sm')
                             ui.label(f"Enregistrements: {stats['stocks']['total_records']:,}").classes('text-sm')
         except Exception as e:
-            ui.notify(f'Erreur: {e}', type='negative')
+            ui.notify(f'Impossible de charger les statistiques: {e}', type='warning')
     
     ui.button('Actualiser', icon='refresh', on_click=load_stats).classes('mb-4')
     
-    # Chargement initial des stats
-    try:
-        response = requests.get(f'{BACKEND_URL}/api/stats', timeout=5)
-        if response.status_code == 200:
-            stats = response.json()
-            with stats_container:
-                with ui.row().classes('w-full gap-4'):
-                    # Stats Crypto
-                    with ui.card().classes('p-4'):
-                        ui.label('Crypto-monnaies').classes('text-lg font-bold')
-                        ui.label(f"Symboles: {stats['crypto']['symbols_count']}").classes('text-sm')
-                        ui.label(f"Enregistrements: {stats['crypto']['total_records']:,}").classes('text-sm')
-                    
-                    # Stats Actions
-                    with ui.card().classes('p-4'):
-                        ui.label('Actions françaises').classes('text-lg font-bold')
-                        ui.label(f"Symboles: {stats['stocks']['symbols_count']}").classes('text-sm')
-                        ui.label(f"Enregistrements: {stats['stocks']['total_records']:,}").classes('text-sm')
-    except Exception as e:
-        ui.notify(f'Impossible de charger les statistiques: {e}', type='warning')
+    # Chargement initial des stats après l'affichage de la page
+    ui.timer(0.1, load_stats, once=True)
 
 
 if __name__ in {"__main__", "__mp_main__"}: